@@ -1,10 +1,22 @@
 import streamlit as st
-from treys import Card, Deck, Evaluator
-from itertools import combinations
+from treys import Card, Deck
+from decision import call_decision
+from hand_eval import TableEvaluator
+from instrument import PerfRecorder
+from jobs import JobRunner
+from outs import best_five, outs_analysis
+from poker_odds import TIE_SHARE, advance_street, cache_stats, warm_up
+from preflop import preflop_equity
+from ranges import parse_range
+from strength import strength_distribution
+from streamlit_autorefresh import st_autorefresh
+from ui import ANIMATION_CSS, HAND_RANKS, RANKS, SUITS, best_five_html, board_html, hand_html, hands_grid_html, pretty
 
 # =====================================================
 # PAGE CONFIG
 # =====================================================
+OPPONENT_OPTIONS = [i for i in range(2,11)]
+
 
 st.set_page_config(
     page_title="Poker Assistant",
@@ -17,31 +29,17 @@ col1,col2 = st.columns([3,1])
 with col1:
     st.caption("Texas Hold’em")
 with col2:
+    # Keyed so the choice actually reaches st.session_state.num_opponents.
     st.selectbox(
         label="Number of Opponents",
-        options = [i for i in range(2,11)],
+        options = OPPONENT_OPTIONS,
+        key="num_opponents",
         help="Select how many opponents you want to simulate against (2-10)"
     )
-st.session_state.num_opponents = st.session_state.num_opponents if "num_opponents" in st.session_state else 2
 if "animate_hand" not in st.session_state:
     st.session_state.animate_hand = False
     
-st.markdown("""
-<style>
-@keyframes slideApart {
-    from {
-        margin-left: -60px;
-        opacity: 0.7;
-        transform: translateY(4px);
-    }
-    to {
-        margin-left: -20px;
-        opacity: 1;
-        transform: translateY(0);
-    }
-}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(ANIMATION_CSS, unsafe_allow_html=True)
 
 # st.markdown("""
 # <style>
@@ -63,7 +61,36 @@ st.markdown("""
 # }
 # </style>
 # """, unsafe_allow_html=True)
-evaluator = Evaluator()
+# Built once per server process by the first session, which also warms
+# the lookup tables and hot paths; results are shared through the
+# poker_odds cache (POKER_CACHE_MB / _TTL).
+@st.cache_resource
+def get_engine():
+    return TableEvaluator(), warm_up()
+
+
+evaluator, warm_up_ms = get_engine()
+perf = PerfRecorder(cache_stats)
+
+# Seconds a rerun waits for odds before drawing a placeholder, and how
+# often the page polls a job that is still running.
+ODDS_WAIT = 0.1
+ODDS_REFRESH_MS = 300
+
+
+@st.cache_resource
+def get_job_runner():
+    return JobRunner()
+
+
+@st.cache_data(max_entries=256)
+def get_strength(player, board, num_opponents):
+    return strength_distribution(list(player), list(board), num_opponents)
+
+
+@st.cache_data(max_entries=256)
+def get_outs(player, board, threats):
+    return outs_analysis(list(player), list(board), list(threats))
 
 # =====================================================
 # SESSION STATE INIT
@@ -80,26 +107,14 @@ if "board_cards" not in st.session_state:
 if "stage" not in st.session_state:
     st.session_state.stage = "Preflop"
 
-# =====================================================
-# CONSTANTS & HELPERS
-# =====================================================
-SUITS = {"s": "♠", "h": "♥", "d": "♦", "c": "♣"}
-RANKS = ["A","K","Q","J","T","9","8","7","6","5","4","3","2"]
-HAND_RANKS = {
-    0: "Royal Flush",
-    1: "Straight Flush",
-    2: "Four of a Kind",
-    3: "Full House",
-    4: "Flush",
-    5: "Straight",
-    6: "Three of a Kind",
-    7: "Two Pair",
-    8: "One Pair",
-    9: "High Card",
-}
-def pretty(card):
-    r, s = Card.int_to_str(card)
-    return r + SUITS[s]
+if "street" not in st.session_state:
+    st.session_state.street = None
+
+if "odds_job" not in st.session_state:
+    st.session_state.odds_job = None
+
+if "sweep_job" not in st.session_state:
+    st.session_state.sweep_job = None
 
 # =====================================================
 # DECK RENDERER (FOR DIALOGS)
@@ -284,12 +299,13 @@ if st.session_state.stage == "Done":
             st.session_state.available_cards = Deck().cards.copy()
             st.session_state.player_cards = []
             st.session_state.board_cards = []
+            st.session_state.street = None
             st.session_state.stage = "Preflop"
             st.rerun()
 # =====================================================
 # MONTE CARLO ODDS (AUTO)
 # =====================================================
-def get_best_hand(player_cards, board_cards):
+def get_best_hand(player_cards, board_cards, score=None):
     """
     Returns:
         hand_name (str)
@@ -303,29 +319,14 @@ def get_best_hand(player_cards, board_cards):
     if len(cards) < 5:
         return None, None, None
 
-    score = evaluator.evaluate(board_cards, player_cards)
+    if score is None:
+        score = evaluator.evaluate(board_cards, player_cards)
     rank_class = evaluator.get_rank_class(score)
     hand_name = HAND_RANKS[rank_class]
-    # print(hand_name)
-    # Get exact best 5-card hand
-    # best_5_cards = None
-    # best_rank = None
-    # for cardCombo in combinations(cards, 5):
-    #     if best_5_cards is not None:
-    #         score = evaluator.evaluate(board_cards, list(cardCombo))
-    #         rank = evaluator.get_five_card_rank_percentage(score)
-    #         if rank > best_rank:
-    #             best_rank = rank
-    #             best_5_cards = list(cardCombo)
-    #     else:
-    #         best_5_cards = list(cardCombo)
-    #         score = evaluator.evaluate(board_cards, list(cardCombo))
-    #         best_rank = evaluator.get_five_card_rank_percentage(score)
-    # else:
-    #     best_5_cards = None
-    
-    # return hand_name, best_5_cards, rank_class
-    return hand_name, None, rank_class
+    # All 5-card subsets scored in one vectorized call.
+    best_5_cards = best_five(player_cards, board_cards)
+
+    return hand_name, best_5_cards, rank_class
 def render_hand_strength(hand_name):
     st.markdown(
         f"""
@@ -343,69 +344,46 @@ def render_hand_strength(hand_name):
     )
 
 
-def simulate_odds(player, board, opponents=2, sims=10000):
-    wins = ties = losses = 0
-
-    for _ in range(sims):
-        deck = Deck()
-        for c in player + board:
-            deck.cards.remove(c)
-
-        opps = [[deck.draw(1)[0], deck.draw(1)[0]] for _ in range(opponents)]
-
-        full_board = board[:]
-        while len(full_board) < 5:
-            full_board.append(deck.draw(1)[0])
+# =====================================================
+# CALL OR FOLD
+# =====================================================
+def render_decision(estimate, tie_share, pot, to_call, hero_stack, opponent_stack):
+    win, tie, _ = estimate
+    with perf.phase("decision"):
+        decision = call_decision(
+            win, tie, pot, to_call, hero_stack, opponent_stack,
+            st.session_state.num_opponents, tie_share
+        )
 
-        my_score = evaluator.evaluate(full_board, player)
-        opp_score = min(evaluator.evaluate(full_board, o) for o in opps)
+    d1, d2, d3 = st.columns(3)
+    d1.metric("Your Equity", f"{decision['equity']*100:.1f}%")
+    d2.metric("Needed", f"{decision['required_equity']*100:.1f}%")
+    d3.metric("Call EV", f"{decision['call_ev']:+,.1f}")
+
+    if to_call == 0:
+        st.success("Nothing to call — check for free")
+    elif decision["call"] == 0:
+        st.info("You're already all in — nothing left to put in")
+    elif decision["action"] == "call":
+        st.success(f"CALL — pot odds {decision['pot_odds']:.1f} to 1")
+    elif decision["implied_ok"]:
+        st.warning(
+            f"Call only with implied odds: win {decision['implied_needed']:,.0f} more "
+            f"later (at most {decision['implied_max']:,.0f} behind)"
+        )
+    else:
+        st.error("FOLD — not enough in the pot or behind to pay for the call")
 
-        if my_score < opp_score:
-            wins += 1
-        elif my_score == opp_score:
-            ties += 1
-        else:
-            losses += 1
+    if decision["implied_equity"] is not None and decision["call"]:
+        st.caption(
+            f"Break-even equity if you win every chip behind: {decision['implied_equity']*100:.1f}%. "
+            f"Ties count as {tie_share*100:.0f}% of the pot against {st.session_state.num_opponents} opponents."
+        )
 
-    t = wins + ties + losses
-    return wins/t, ties/t, losses/t
 
 # =====================================================
 # NUTS + THREATS
 # =====================================================
-def find_nuts(board, player):
-    deck = Deck()
-    for c in (board+player):
-        deck.cards.remove(c)
-
-    best = 7462
-    nuts = []
-    for opp in combinations(deck.cards, 2):
-        s = evaluator.evaluate(board, list(opp))
-        if s < best:
-            best = s
-            nuts = [opp]
-        elif s == best:
-            nuts.append(opp)
-
-    return best, nuts
-
-def hands_that_beat(player, board, limit=9):
-    deck = Deck()
-    for c in player + board:
-        deck.cards.remove(c)
-
-    my_score = evaluator.evaluate(board, player)
-    threats = []
-
-    for opp in combinations(deck.cards, 2):
-        s = evaluator.evaluate(board, list(opp))
-        if s < my_score:
-            threats.append((opp, s))
-
-    threats.sort(key=lambda x: x[1])
-    return threats[:limit]
-
 def render_card_row(cards, key_prefix):
     cols = st.columns(len(cards))
     for i, c in enumerate(cards):
@@ -414,335 +392,26 @@ def render_card_row(cards, key_prefix):
         cols[i].button(label, disabled=True, key=f"{key_prefix}_{i}")
 
 def render_hand_as_cards(cards,animate):
-    animate_css = "animation: slideApart 2s ease-out;" if animate and st.session_state.stage == "PreFlop" else ""
-
-    card1, card2 = cards
-
-    r1, s1 = Card.int_to_str(card1)
-    r2, s2 = Card.int_to_str(card2)
-
-    suit_symbol1 = SUITS[s1]
-    suit_symbol2 = SUITS[s2]
-
-    color1 = "red" if s1 in ["h", "d"] else "black"
-    color2 = "red" if s2 in ["h", "d"] else "black"
-
-    html = f"""
-    <div class='hand'>
-        <div style="display:flex; align-items:center;gap:50px;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                margin-left:30%;
-                font-weight:bold;
-                color:{color1};
-            ">
-                <div style="font-size:12px;">{r1}{suit_symbol1}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol1}</div>
-                <div style="font-size:12px; text-align:right;">{r1}{suit_symbol1}</div>
-            </div>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                font-weight:bold;
-                color:{color2};
-                margin-left:-20px;
-                {animate_css};
-            ">
-                <div style="font-size:12px;">{r2}{suit_symbol2}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol2}</div>
-                <div style="font-size:12px; text-align:right;">{r2}{suit_symbol2}</div>
-            </div>
-        </div>
-    </div>
-    """
+    st.markdown(hand_html(tuple(cards), animate and st.session_state.stage == "PreFlop"), unsafe_allow_html=True)
 
-    st.markdown(html, unsafe_allow_html=True)
-def render_best_5_cards(cards):
-    animate_css = "animation: slideApart 2s ease-out;" if st.session_state.animate_hand else ""
-    html = "<div style='display:flex; justify-content:center; gap:10px;'>"
-
-    card1, card2, card3, card4, card5 = cards
-
-    r1, s1 = Card.int_to_str(card1)
-    r2, s2 = Card.int_to_str(card2)
-    r2, s2 = Card.int_to_str(card2)
-    r3, s3 = Card.int_to_str(card3)
-    r4, s4 = Card.int_to_str(card4)
-    r5, s5 = Card.int_to_str(card5)
-
-    suit_symbol1 = SUITS[s1]
-    suit_symbol2 = SUITS[s2]
-    suit_symbol3 = SUITS[s3]
-    suit_symbol4 = SUITS[s4]
-    suit_symbol5 = SUITS[s5]
-
-    color1 = "red" if s1 in ["h", "d"] else "black"
-    color2 = "red" if s2 in ["h", "d"] else "black"
-    color3 = "red" if s3 in ["h", "d"] else "black"
-    color4 = "red" if s4 in ["h", "d"] else "black"
-    color5 = "red" if s5 in ["h", "d"] else "black"
-
-    html = f"""
-    <div class='hand'>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                margin-left:30%;
-                font-weight:bold;
-                color:{color1};
-            ">
-                <div style="font-size:12px;">{r1}{suit_symbol1}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol1}</div>
-                <div style="font-size:12px; text-align:right;">{r1}{suit_symbol1}</div>
-            </div>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                font-weight:bold;
-                color:{color2};
-                margin-left:-20px;
-                {animate_css}
-            ">
-                <div style="font-size:12px;">{r2}{suit_symbol2}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol2}</div>
-                <div style="font-size:12px; text-align:right;">{r2}{suit_symbol2}</div>
-            </div>
-        </div>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                font-weight:bold;
-                color:{color3};
-                margin-left:-20px;
-                {animate_css}
-            ">
-                <div style="font-size:12px;">{r3}{suit_symbol3}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol3}</div>
-                <div style="font-size:12px; text-align:right;">{r3}{suit_symbol3}</div>
-            </div>
-        </div>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                font-weight:bold;
-                color:{color4};
-                margin-left:-20px;
-                {animate_css}
-            ">
-                <div style="font-size:12px;">{r4}{suit_symbol4}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol4}</div>
-                <div style="font-size:12px; text-align:right;">{r4}{suit_symbol4}</div>
-            </div>
-        </div>
-        <div style="display:flex; align-items:center;">
-            <div style="
-                width:60px;
-                height:90px;
-                border:1.5px solid #333;
-                border-radius:8px;
-                background:white;
-                box-shadow:2px 2px 6px rgba(0,0,0,0.25);
-                display:flex;
-                flex-direction:column;
-                justify-content:space-between;
-                padding:4px;
-                font-weight:bold;
-                color:{color5};
-                margin-left:-20px;
-                {animate_css}
-            ">
-                <div style="font-size:12px;">{r5}{suit_symbol5}</div>
-                <div style="font-size:26px; text-align:center;">{suit_symbol5}</div>
-                <div style="font-size:12px; text-align:right;">{r5}{suit_symbol5}</div>
-            </div>
-        </div>
-        
-    </div>
-    """
 
-    st.markdown(html, unsafe_allow_html=True)
+def render_best_5_cards(cards):
+    st.markdown(best_five_html(tuple(cards), st.session_state.animate_hand), unsafe_allow_html=True)
 
 
 def render_board_as_cards(cards,player):
-    animate_css1 = "animation: slideApart 2s ease-out;" if st.session_state.animate_hand and len(cards)==3 else ""
-    animate_css2 = "animation: slideApart 2s ease-out;" if st.session_state.animate_hand and len(cards)==4 else ""
-    animate_css3 = "animation: slideApart 2s ease-out;" if st.session_state.animate_hand and len(cards)==5 else ""
-
-
-    html = "<div class='table'><div style='display:flex;gap:12px;margin-left:15%;'>"
-    try:
-
-        r1, s1 = Card.int_to_str(cards[0])
-        col1 = "red" if s1 in ["h", "d"] else "black"
-
-        part1 = f"""\
-        <div style='display:flex;gap:12px;'>
-            <div style="width:60px;height:90px;border-radius:8px;
-            background:white;border:1.5px solid #333;padding:4px;
-            font-weight:bold;color:{col1};">
-                <div style="font-size:12px;">{r1}{SUITS[s1]}</div>
-                <div style="font-size:26px;text-align:center;">{SUITS[s1]}</div>
-                <div style="font-size:12px; text-align:right;">{r1}{SUITS[s1]}</div>    
-        </div>"""
-    except:
-        part1=""
-    try:
-        r2, s2 = Card.int_to_str(cards[1])
-        col2 = "red" if s2 in ["h", "d"] else "black"
-
-        part2 = f"""\
-        <div style='display:flex;gap:12px;'>
-            <div style="width:60px;height:90px;border-radius:8px;
-            background:white;border:1.5px solid #333;padding:4px;
-            font-weight:bold;color:{col2};{animate_css1}">
-                <div style="font-size:12px;">{r2}{SUITS[s2]}</div>
-                <div style="font-size:26px;text-align:center;">{SUITS[s2]}</div>
-                <div style="font-size:12px; text-align:right;">{r2}{SUITS[s2]}</div>
-        </div>"""
-    except:
-        part2 = ""
-    try:
-        r3, s3 = Card.int_to_str(cards[2])
-        col3 = "red" if s3 in ["h", "d"] else "black"
-        part3 = f"""\
-        <div style='display:flex;gap:75px;'>
-            <div style="width:60px;height:90px;border-radius:8px;
-            background:white;border:1.5px solid #333;padding:4px;
-            font-weight:bold;color:{col3};{animate_css1}">
-                <div style="font-size:12px;">{r3}{SUITS[s3]}</div>
-                <div style="font-size:26px;text-align:center;">{SUITS[s3]}</div>
-                <div style="font-size:12px; text-align:right;">{r3}{SUITS[s3]}</div>
-        </div>"""
-    except :
-        part3 = ""
-    try:
-
-        r4, s4 = Card.int_to_str(cards[3])
-        col4 = "red" if s4 in ["h", "d"] else "black"
-        part4 = f"""\
-            <div style='display:flex;gap:75px;'>
-                <div style="width:60px;height:90px;border-radius:8px;
-                background:white;border:1.5px solid #333;padding:4px;
-                font-weight:bold;color:{col4};{animate_css2}">
-                    <div style="font-size:12px;">{r4}{SUITS[s4]}</div>
-                    <div style="font-size:26px;text-align:center;">{SUITS[s4]}</div>
-                    <div style="font-size:12px; text-align:right;">{r4}{SUITS[s4]}</div>
-            </div>"""
-    except:
-        part4 = ""
-
-    try:
-        r5, s5 = Card.int_to_str(cards[4])
-        col5 = "red" if s5 in ["h", "d"] else "black"
-        part5 = f"""\
-            <div style='display:flex;gap:12px;'>
-                <div style="width:60px;height:90px;border-radius:8px;
-                background:white;border:1.5px solid #333;padding:4px;
-                font-weight:bold;color:{col5};{animate_css3}">
-                    <div style="font-size:12px;">{r5}{SUITS[s5]}</div>
-                    <div style="font-size:26px;text-align:center;">{SUITS[s5]}</div>
-                    <div style="font-size:12px; text-align:right;">{r5}{SUITS[s5]}</div>
-            </div>"""
-    except:
-        part5 = ""
-    
-    
-    try:
-        r6, s6 = Card.int_to_str(player[0])
-        col6 = "red" if s6 in ["h", "d"] else "black"
-        part6 = f"""\
-            <div style='display:flex;gap:12px;'>
-                <div style="width:60px;height:90px;border-radius:8px;
-                background:white;border:1.5px solid #333;padding:4px;
-                font-weight:bold;color:{col6};">
-                    <div style="font-size:12px;">{r6}{SUITS[s6]}</div>
-                    <div style="font-size:26px;text-align:center;">{SUITS[s6]}</div>
-                    <div style="font-size:12px; text-align:right;">{r6}{SUITS[s6]}</div>
-            </div>"""
-    except:
-        part6 = ""
-
-    try:
-        r7, s7 = Card.int_to_str(player[1])
-        col7 = "red" if s7 in ["h", "d"] else "black"
-        part7 = f"""\
-            <div style='display:flex;gap:12px;'>
-                <div style="width:60px;height:90px;border-radius:8px;
-                background:white;border:1.5px solid #333;padding:4px;
-                font-weight:bold;color:{col7};">
-                    <div style="font-size:12px;">{r7}{SUITS[s7]}</div>
-                    <div style="font-size:26px;text-align:center;">{SUITS[s7]}</div>
-                    <div style="font-size:12px; text-align:right;">{r7}{SUITS[s7]}</div>
-            </div>"""
-    except:
-        part7 = ""
-
-
-
-    html += f"""
-    <div class='table'>
-{part1}
-{part2}
-{part3}
-{part4}
-{part5}
-    """
-    st.markdown(html, unsafe_allow_html=True)
-def render_table_view(board, hand):
+    st.markdown(board_html(tuple(cards), st.session_state.animate_hand), unsafe_allow_html=True)
+
+
+def render_hands_grid(hands, animate):
+    # Every hand in one markdown element rather than a column per combo.
+    st.markdown(
+        hands_grid_html(tuple(tuple(h) for h in hands), animate and st.session_state.stage == "PreFlop"),
+        unsafe_allow_html=True
+    )
+
+
+def render_table_view(board, hand, analysis=None):
     st.divider()
     if board:
         render_board_as_cards(board,hand)
@@ -755,12 +424,13 @@ def render_table_view(board, hand):
         if len(board) >= 3:
             hand_name, best_5, rank = get_best_hand(
             st.session_state.player_cards,
-            st.session_state.board_cards
+            st.session_state.board_cards,
+            analysis["hero_score"] if analysis else None
         )
 
             if hand_name:
                 render_hand_strength(hand_name)
-                # render_best_5_cards(best_5)
+                render_best_5_cards(best_5)
 
     
 
@@ -771,67 +441,244 @@ def render_table_view(board, hand):
 
 if len(st.session_state.player_cards) == 2:
 
-    render_table_view(
-        st.session_state.board_cards,
-        st.session_state.player_cards
-    )
-    win, tie, lose = simulate_odds(
-        st.session_state.player_cards,
-        st.session_state.board_cards,
-        opponents=st.session_state.num_opponents
-    )
+    # One pass over every opponent holding feeds the hand strength, nuts
+    # and threats sections below.
+    # The street state lives across reruns, so a new board card only
+    # rescores the holdings it leaves live.
+    with perf.phase("analysis"):
+        st.session_state.street = advance_street(
+            st.session_state.street,
+            st.session_state.player_cards,
+            st.session_state.board_cards
+        )
+        analysis = (
+            st.session_state.street.analysis()
+            if len(st.session_state.board_cards) >= 3 else None
+        )
 
+    with perf.phase("table_view"):
+        render_table_view(
+            st.session_state.board_cards,
+            st.session_state.player_cards,
+            analysis
+        )
     st.divider()
     st.subheader("📊 Live Odds")
 
+    range_spec = st.text_input(
+        "Opponent range",
+        key="opponent_range",
+        placeholder="random",
+        help="Every opponent holds this range, e.g. top 15%, pairs+broadway, TT+, AKs:0.5"
+    ).strip()
+    ranges = None
+    if range_spec and range_spec.lower() not in ("random", "any"):
+        try:
+            parse_range(range_spec)
+            ranges = (range_spec,) * st.session_state.num_opponents
+        except ValueError as e:
+            st.error(f"Bad range: {e} — using random hands")
+
+    # Odds run on a background thread; picking another card cancels the
+    # old job and the page polls until the new one finishes.
+    with perf.phase("odds"):
+        job = get_job_runner().submit(
+            st.session_state.odds_job,
+            st.session_state.player_cards,
+            st.session_state.board_cards,
+            st.session_state.num_opponents,
+            ranges
+        )
+        st.session_state.odds_job = job
+        job.wait(ODDS_WAIT)
+        odds = job.snapshot
+
+    # One sweep covers every table size, so a new opponent count shows
+    # its numbers at once while the precise run catches up. It runs on
+    # the job threads too; until it lands, preflop counts come from the
+    # precomputed table.
+    with perf.phase("sweep"):
+        sweep_job = get_job_runner().submit_sweep(
+            st.session_state.sweep_job,
+            st.session_state.player_cards,
+            st.session_state.board_cards,
+            max(OPPONENT_OPTIONS)
+        )
+        st.session_state.sweep_job = sweep_job
+        sweep = sweep_job.snapshot
+
+    # The sweep is against random hands, so it only stands in for those.
+    estimate = None
+    tie_share = TIE_SHARE
+    if sweep is not None:
+        tie_share = sweep[st.session_state.num_opponents][3]
+    if odds is not None:
+        estimate = odds["win"], odds["tie"], odds["lose"]
+    elif ranges is None and sweep is not None:
+        estimate = sweep[st.session_state.num_opponents][:3]
+    elif ranges is None and not st.session_state.board_cards:
+        estimate = preflop_equity(st.session_state.player_cards, st.session_state.num_opponents)
+
     c1, c2, c3 = st.columns(3)
-    c1.metric("Win", f"{win*100:.1f}%")
-    c2.metric("Tie", f"{tie*100:.1f}%")
-    c3.metric("Lose", f"{lose*100:.1f}%")
+    if odds is None:
+        for col, label, value in zip((c1, c2, c3), ("Win", "Tie", "Lose"), estimate or (None,) * 3):
+            col.metric(label, "—" if value is None else f"{value*100:.1f}%")
+        st.caption("Quick estimate; refining…" if estimate else "Simulating…")
+    else:
+        c1.metric("Win", f"{odds['win']*100:.1f}%")
+        c2.metric("Tie", f"{odds['tie']*100:.1f}%")
+        c3.metric("Lose", f"{odds['lose']*100:.1f}%")
+        if odds["margin"] == 0:
+            st.caption(f"Exact over {odds['simulations']:,} deals")
+        elif odds["margin"] is not None:
+            st.caption(f"±{odds['margin']*100:.1f}% (95% confidence, {odds['simulations']:,} simulations)")
+
+    with st.expander("👥 Equity by table size"):
+        if sweep is None:
+            st.caption("Simulating every table size…")
+        else:
+            st.line_chart(
+                {
+                    "Opponents": list(sweep),
+                    "Win": [v[0] for v in sweep.values()],
+                    "Tie": [v[1] for v in sweep.values()],
+                    "Lose": [v[2] for v in sweep.values()],
+                },
+                x="Opponents",
+                y=["Win", "Tie", "Lose"]
+            )
+
+    st.divider()
+    st.subheader("💰 Call or Fold")
+
+    # Only arithmetic on the odds above: bet sizes never re-run a simulation.
+    b1, b2, b3, b4 = st.columns(4)
+    pot = b1.number_input("Pot", min_value=0.0, value=100.0, step=10.0, key="pot_size",
+                          help="Everything in the middle, including the bet you face")
+    to_call = b2.number_input("To call", min_value=0.0, value=50.0, step=10.0, key="to_call")
+    hero_stack = b3.number_input("Your stack", min_value=0.0, value=1000.0, step=50.0, key="hero_stack")
+    opponent_stack = b4.number_input("Opponent stack", min_value=0.0, value=1000.0, step=50.0,
+                                     key="opponent_stack", help="Largest stack among the opponents")
+
+    if estimate is None:
+        st.caption("Waiting for the odds…")
+    else:
+        render_decision(estimate, tie_share, pot, to_call, hero_stack, opponent_stack)
+
+    if job.error is not None:
+        st.error(f"Odds failed: {job.error}")
+    elif sweep_job.error is not None:
+        st.error(f"Table-size sweep failed: {sweep_job.error}")
+    if not (job.done and sweep_job.done):
+        st_autorefresh(interval=ODDS_REFRESH_MS, key="odds_refresh")
 
     if len(st.session_state.board_cards) >= 3:
         st.divider()
         st.subheader("🔥 Nuts Analysis")
 
-        best, nuts = find_nuts(
-            st.session_state.board_cards,
-            st.session_state.player_cards
-        )
-
-        my_score = evaluator.evaluate(
-            st.session_state.board_cards,
-            st.session_state.player_cards
-        )
+        best, nuts = analysis["best"], analysis["nuts"]
+        my_score = analysis["hero_score"]
 
+        with perf.phase("nuts"):
+            if my_score == best:
+                st.success(f"YOU HAVE THE NUTS — Score : {my_score}")
+            else:
+                st.warning("You do NOT have the nuts (Your Score: " + str(my_score) + " | Best Possible: " + str(best) + ")")
 
-        if my_score == best:
-            st.success(f"YOU HAVE THE NUTS — Score : {my_score}")
-        else:
-            st.warning("You do NOT have the nuts (Your Score: " + str(my_score) + " | Best Possible: " + str(best) + ")")
-        
-            st.markdown("**Unbeatable hands:**")
-            cols = st.columns(3)
-            for idx, h in enumerate(nuts[:5]):
-                with cols[idx%3]:
-                    render_hand_as_cards(h,st.session_state.animate_hand)
+                st.markdown("**Unbeatable hands:**")
+                render_hands_grid(nuts[:5], st.session_state.animate_hand)
 
 
         st.divider()
         st.subheader("💀 Hands That Beat You")
 
-        threats = hands_that_beat(
-            st.session_state.player_cards,
-            st.session_state.board_cards
-        )
+        threats = analysis["threats"][:9]
 
-        if not threats:
-            st.success("No hand can beat you")
-        else:
-            cols = st.columns(3)
-            with st.container():
-                for i, (opp, _) in enumerate(threats):
-                    # st.markdown("• " + " ".join(pretty(c) for c in opp))
-                    with cols[i % 3]:
-                        render_hand_as_cards(opp,st.session_state.animate_hand)
-        st.session_state.animate_hand = False
+        with perf.phase("threats"):
+            if not threats:
+                st.success("No hand can beat you")
+            else:
+                st.caption(
+                    f"{analysis['beats']} of {len(analysis['scores'])} holdings beat you, "
+                    f"{analysis['ties']} tie"
+                )
+                render_hands_grid([opp for opp, _ in threats], st.session_state.animate_hand)
+
+    if len(st.session_state.board_cards) >= 3:
+        st.divider()
+        st.subheader("📈 Equity Distribution")
+
+        with perf.phase("strength"):
+            strength = get_strength(
+                tuple(st.session_state.player_cards),
+                tuple(st.session_state.board_cards),
+                st.session_state.num_opponents
+            )
+
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Hand Strength", f"{strength['hs']*100:.1f}%")
+            c2.metric("EHS", f"{strength['ehs']*100:.1f}%")
+            c3.metric("Positive Potential", f"{strength['ppot']*100:.1f}%")
+            c4.metric("Negative Potential", f"{strength['npot']*100:.1f}%")
+
+            edges = range(0, 100, 100 // len(strength["histogram"]))
+            st.bar_chart(
+                {
+                    "Your equity": [f"{e}–{e + 100 // len(strength['histogram'])}%" for e in edges],
+                    "Opponent holdings": strength["histogram"].tolist(),
+                },
+                x="Your equity",
+                y="Opponent holdings"
+            )
+            st.caption(
+                f"Heads-up equity {strength['equity_mean']*100:.1f}% against a random holding; "
+                f"you are at least even against {strength['percentile']*100:.0f}% of "
+                f"{len(strength['holdings'])} holdings. "
+                f"EHS uses hand strength against {st.session_state.num_opponents} opponents."
+            )
+
+    if 3 <= len(st.session_state.board_cards) < 5:
+        st.divider()
+        st.subheader("🎯 Outs")
+
+        with perf.phase("outs"):
+            # Threats come from the street's analysis above, not a second pass.
+            outs = get_outs(
+                tuple(st.session_state.player_cards),
+                tuple(st.session_state.board_cards),
+                tuple(h for h, _ in analysis["threats"])
+            )
+
+            if not outs["next_card"]:
+                st.caption("No card improves your hand class")
+            else:
+                st.table([
+                    {
+                        "Improves to": HAND_RANKS[cls],
+                        "Outs": " ".join(pretty(c) for c in outs["outs"].get(cls, [])),
+                        "Next card": f"{outs['next_card'].get(cls, 0)*100:.1f}%",
+                        **({"By the river": f"{outs['by_river'].get(cls, 0)*100:.1f}%"}
+                           if outs["by_river"] is not None else {})
+                    }
+                    for cls in sorted(set(outs["next_card"]) | set(outs["by_river"] or {}))
+                ])
+
+            if outs["clear_next"] is not None:
+                line = f"Ahead of every current threat: {outs['clear_next']*100:.1f}% on the next card"
+                if outs["clear_by_river"] is not None:
+                    line += f", {outs['clear_by_river']*100:.1f}% by the river"
+                st.caption(line)
+                if outs["threat_outs"]:
+                    st.markdown("**Cards that get you there:** " + " ".join(pretty(c) for c in outs["threat_outs"]))
+
+    st.session_state.animate_hand = False
+
+# =====================================================
+# PERFORMANCE (POKER_PERF=1)
+# =====================================================
+if perf.enabled and perf.phases:
+    with st.expander("⏱ Performance"):
+        st.caption(f"{perf.total_ms():.1f} ms across instrumented phases")
+        st.dataframe(perf.phases, hide_index=True)
+        st.json({"cache": cache_stats(), "warm_up_ms": warm_up_ms}, expanded=False)
                     
@@ -0,0 +1,245 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from treys import Card
+
+from outs import rank_class
+from poker_odds import TARGET_MARGIN, cached_adaptive_equity, cached_analysis
+from ui import HAND_RANKS
+
+# Records handed to a worker at a time, and chunks in flight per worker;
+# together they bound how much of the input is held in memory.
+CHUNK_SIZE = 256
+CHUNKS_PER_WORKER = 2
+
+OUTPUT_FIELDS = [
+    "line", "hole", "board", "opponents",
+    "win", "tie", "lose", "margin", "simulations",
+    "hand", "hero_score", "best", "nuts", "beats", "ties", "loses", "threats",
+    "error",
+]
+
+
+# =====================================================
+# INPUT
+# =====================================================
+def parse_cards(value):
+    """
+    Cards from "As Kh", "AsKh", "As,Kh" or a list of card strings.
+    Raises ValueError for anything that is not a list of valid cards.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        text = value.replace(",", "").replace(" ", "")
+        value = [text[i:i + 2] for i in range(0, len(text), 2)]
+    cards = []
+    for c in value:
+        if not isinstance(c, str) or len(c) != 2:
+            raise ValueError(f"bad card {c!r}")
+        try:
+            cards.append(Card.new(c[0].upper() + c[1].lower()))
+        except KeyError:
+            raise ValueError(f"bad card {c!r}") from None
+    return cards
+
+
+def parse_count(value, name, low, high, default):
+    """
+    A whole number from a JSON number or CSV string, `default` when
+    missing or empty. Raises ValueError unless it is integral (not a
+    bool) and between `low` and `high`.
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.lstrip("+-").isdigit():
+            raise ValueError(f"{name} must be a whole number")
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (
+        isinstance(value, float) and not value.is_integer()
+    ):
+        raise ValueError(f"{name} must be a whole number")
+    value = int(value)
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def parse_spot(record):
+    """
+    Returns:
+        (hole, board) as treys ints from a record's hole (or hand) and
+        board; raises ValueError unless there are 2 distinct hole cards
+        and a 0, 3, 4 or 5 card board
+    """
+    hole = parse_cards(record.get("hole") or record.get("hand"))
+    board = parse_cards(record.get("board"))
+    if len(hole) != 2 or len(board) not in (0, 3, 4, 5) or len(set(hole + board)) != len(hole + board):
+        raise ValueError("need 2 distinct hole cards and a 0, 3, 4 or 5 card board")
+    return hole, board
+
+
+def read_records(path):
+    """
+    Streams (line, record) pairs from a .csv (header with hole, board,
+    opponents) or .jsonl file; "-" reads JSONL from stdin. A line that
+    is not valid JSON comes through as a ValueError record, so it
+    becomes an error row rather than ending the run.
+    """
+    f = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        if path.endswith(".csv"):
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield line, row
+        else:
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    try:
+                        yield line, json.loads(text)
+                    except json.JSONDecodeError as e:
+                        yield line, ValueError(f"invalid JSON: {e.msg}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# =====================================================
+# ANALYSIS
+# =====================================================
+def pretty_cards(cards):
+    return "".join(Card.int_to_str(c) for c in cards)
+
+
+def analyze_record(line, record, target=TARGET_MARGIN, threats=5):
+    """
+    Equity plus (from the flop on) nuts and threats for one record.
+
+    Returns:
+        dict with the OUTPUT_FIELDS that apply; "error" is set instead of
+        the results when the record cannot be analyzed
+    """
+    out = {"line": line}
+    try:
+        if isinstance(record, ValueError):
+            raise record
+        if not isinstance(record, dict):
+            raise ValueError("record must be an object")
+        hole, board = parse_spot(record)
+        opponents = parse_count(record.get("opponents"), "opponents", 1, 9, 1)
+        out.update(hole=pretty_cards(hole), board=pretty_cards(board), opponents=opponents)
+
+        odds = cached_adaptive_equity(hole, board, opponents, target)
+        out.update(
+            win=round(odds["win"], 6),
+            tie=round(odds["tie"], 6),
+            lose=round(odds["lose"], 6),
+            margin=odds["margin"],
+            simulations=odds["simulations"]
+        )
+
+        if len(board) >= 3:
+            analysis = cached_analysis(hole, board)
+            out.update(
+                hand=HAND_RANKS[int(rank_class(analysis["hero_score"]))],
+                hero_score=analysis["hero_score"],
+                best=analysis["best"],
+                nuts=" ".join(pretty_cards(h) for h in analysis["nuts"]),
+                beats=analysis["beats"],
+                ties=analysis["ties"],
+                loses=analysis["loses"],
+                threats=" ".join(pretty_cards(h) for h, _ in analysis["threats"][:threats])
+            )
+    except (KeyError, ValueError, TypeError, OverflowError) as e:
+        out["error"] = str(e) or type(e).__name__
+    return out
+
+
+def analyze_chunk(chunk, target=TARGET_MARGIN, threats=5):
+    return [analyze_record(line, record, target, threats) for line, record in chunk]
+
+
+def analyze_stream(records, workers=1, chunk_size=CHUNK_SIZE, target=TARGET_MARGIN, threats=5):
+    """
+    Yields one result per record, in input order. With several workers,
+    chunks run in a process pool with at most CHUNKS_PER_WORKER chunks
+    per worker read ahead of the writer.
+    """
+    if workers <= 1:
+        for chunk in chunks(records, chunk_size):
+            yield from analyze_chunk(chunk, target, threats)
+        return
+
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for chunk in chunks(records, chunk_size):
+            pending.append(pool.submit(analyze_chunk, chunk, target, threats))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# =====================================================
+# OUTPUT
+# =====================================================
+def write_results(results, out, fmt):
+    """
+    Writes results as they arrive and returns (rows, errors).
+    """
+    rows = errors = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, OUTPUT_FIELDS)
+        writer.writeheader()
+    for result in results:
+        if writer is not None:
+            writer.writerow(result)
+        else:
+            out.write(json.dumps(result) + "\n")
+        rows += 1
+        errors += "error" in result
+    return rows, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze a file of hands offline: equity, nuts and threats.")
+    parser.add_argument("input", help=".csv (hole, board, opponents columns) or .jsonl; - for JSONL on stdin")
+    parser.add_argument("--out", default="-", help="output file, .csv or .jsonl (default: JSONL to stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--target", type=float, default=TARGET_MARGIN,
+                        help="95%% confidence half-width to stop sampling at")
+    parser.add_argument("--threats", type=int, default=5, help="threat holdings listed per record")
+    args = parser.parse_args()
+
+    fmt = "csv" if args.out.endswith(".csv") else "jsonl"
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    try:
+        rows, errors = write_results(
+            analyze_stream(read_records(args.input), args.workers, args.chunk_size, args.target, args.threats),
+            out,
+            fmt
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Analyzed {rows:,} records ({errors:,} errors)", file=sys.stderr)
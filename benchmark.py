@@ -0,0 +1,258 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from math import comb
+
+import numpy as np
+from treys import Card
+
+import poker_odds
+from preflop import MAX_OPPONENTS, load_table
+
+BASELINE_PATH = "benchmark_baseline.json"
+SEED = 1234
+
+# Slowdowns smaller than this are timer noise, whatever the ratio.
+NOISE_MS = 0.1
+
+# =====================================================
+# SCENARIOS
+# =====================================================
+# name: (hero, board, opponents)
+SCENARIOS = {
+    "preflop_2": ("As Kh", "", 2),
+    "preflop_5": ("As Kh", "", 5),
+    "preflop_9": ("As Kh", "", 9),
+    "wet_flop": ("Ah Qh", "Jh Th 9c", 2),
+    "paired_turn": ("Kd Qd", "8s 8h 3d Jc", 2),
+    "river": ("As Kh", "Qs Jh 2d 7c 7h", 2),
+}
+
+
+def cards(text):
+    return [Card.new(c) for c in text.split()]
+
+
+def holdings(board):
+    return comb(52 - 2 - len(board), 2)
+
+
+def engine_hands(board, opponents, sims):
+    """
+    Hands simulate_equity actually deals for a spot: None for a preflop
+    table lookup, every deal for an exactly enumerated spot, else `sims`.
+    """
+    if not board and opponents <= MAX_OPPONENTS and load_table() is not None:
+        return None
+    deals = poker_odds.count_deals(len(board), opponents)
+    return deals if deals <= poker_odds.EXACT_LIMIT else sims
+
+
+# Each entry: (function, needs a board, hands per call). Equity functions
+# count deals scored (None for a table lookup, reported without a rate);
+# nuts/threats count opponent holdings scored.
+def _benchmarks(sims):
+    return {
+        "simulate_equity": (
+            lambda h, b, n: poker_odds.simulate_equity(h, b, n, sims, seed=SEED),
+            False, lambda b, n: engine_hands(b, n, sims)),
+        "monte_carlo_equity": (
+            lambda h, b, n: poker_odds.monte_carlo_equity(h, b, n, sims, seed=SEED),
+            False, lambda b, n: sims),
+        "simulate_win_probability": (
+            lambda h, b, n: poker_odds.simulate_win_probability(h, b, n, sims, seed=SEED),
+            False, lambda b, n: engine_hands(b, n, sims)),
+        "find_nuts": (
+            lambda h, b, n: poker_odds.find_nuts(b, h),
+            True, lambda b, n: holdings(b)),
+        "hands_that_beat": (
+            lambda h, b, n: poker_odds.hands_that_beat(h, b),
+            True, lambda b, n: holdings(b)),
+    }
+
+
+# =====================================================
+# RUN
+# =====================================================
+def measure(fn, hero, board, opponents, repeat):
+    fn(hero, board, opponents)  # warm tables and caches of the engine itself
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(hero, board, opponents)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(hero, board, opponents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.array(timings), peak
+
+
+def run(repeat=20, sims=10000):
+    results = {}
+    for name, (fn, needs_board, hands) in _benchmarks(sims).items():
+        for scenario, (hero, board, opponents) in SCENARIOS.items():
+            if needs_board and not board:
+                continue
+            hero_cards, board_cards = cards(hero), cards(board)
+            timings, peak = measure(fn, hero_cards, board_cards, opponents, repeat)
+            key = f"{name}/{scenario}"
+            p50, p99 = np.percentile(timings, [50, 99])
+            dealt = hands(board_cards, opponents)
+            results[key] = {
+                "hands_per_sec": dealt / p50 if dealt is not None else None,
+                "lookup": dealt is None,
+                "min_ms": float(timings.min()) * 1000,
+                "p50_ms": p50 * 1000,
+                "p99_ms": p99 * 1000,
+                "peak_mem_kb": peak / 1024,
+            }
+            rate = "      lookup" if dealt is None else f"{results[key]['hands_per_sec']:12,.0f}"
+            print(f"{key:<40} {rate} hands/s  "
+                  f"p50 {p50 * 1000:8.2f} ms  p99 {p99 * 1000:8.2f} ms  "
+                  f"peak {peak / 1024:8.0f} KB")
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "simulations": sims,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+
+
+# =====================================================
+# STARTUP
+# =====================================================
+# Runs in a fresh interpreter: module imports in dependency order (each
+# timing only what it adds), the engine warm-up, then the Streamlit
+# script's first run and its reruns on a fixed flop.
+STARTUP_SCRIPT = """
+import importlib, json, os, statistics, sys, time
+sys.path.insert(0, os.getcwd())
+report = {"imports_ms": {}}
+for name in ["numpy", "treys", "streamlit", "hand_eval", "poker_odds", "outs",
+             "strength", "jobs", "streamlit_autorefresh", "ui"]:
+    start = time.perf_counter()
+    importlib.import_module(name)
+    report["imports_ms"][name] = (time.perf_counter() - start) * 1000
+
+import poker_odds
+report["warm_up_ms"] = poker_odds.warm_up()
+
+from streamlit.testing.v1 import AppTest
+from treys import Card
+app = AppTest.from_file("app.py", default_timeout=120)
+app.session_state["player_cards"] = [Card.new("As"), Card.new("Kh")]
+app.session_state["board_cards"] = [Card.new(c) for c in ("Qs", "Jh", "2d")]
+app.session_state["stage"] = "Turn"
+app.session_state["available_cards"] = []
+start = time.perf_counter()
+app.run()
+report["first_run_ms"] = (time.perf_counter() - start) * 1000
+app.session_state["odds_job"].wait()
+reruns = []
+for _ in range(REPEAT):
+    start = time.perf_counter()
+    app.run()
+    reruns.append((time.perf_counter() - start) * 1000)
+report["rerun_ms"] = statistics.median(reruns)
+print(json.dumps(report))
+"""
+
+
+def startup(repeat=5):
+    """
+    Measures cold start and per-rerun script time in a fresh interpreter.
+    """
+    out = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT.replace("REPEAT", str(repeat))],
+        capture_output=True, text=True, check=True
+    ).stdout
+    report = json.loads(out.strip().splitlines()[-1])
+    for name, ms in report["imports_ms"].items():
+        print(f"import {name:<34} {ms:8.1f} ms")
+    for name, ms in report["warm_up_ms"].items():
+        print(f"warm-up {name:<33} {ms:8.1f} ms")
+    print(f"{'first script run':<41} {report['first_run_ms']:8.1f} ms")
+    print(f"{'rerun (median)':<41} {report['rerun_ms']:8.1f} ms")
+    return report
+
+
+# =====================================================
+# COMPARE
+# =====================================================
+def compare(baseline, current, threshold=0.25):
+    """
+    Prints best-of-run latency and peak memory against the baseline and
+    returns the benchmarks that got slower or bigger by more than
+    `threshold` (ignoring differences under NOISE_MS or 64 KB). The best
+    run is compared rather than p50 since it is least affected by other
+    load on the machine.
+    """
+    regressions = []
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"{key:<40} new")
+            continue
+        time_ratio = now["min_ms"] / before["min_ms"]
+        mem_ratio = now["peak_mem_kb"] / max(before["peak_mem_kb"], 1)
+        slower = time_ratio > 1 + threshold and now["min_ms"] - before["min_ms"] > NOISE_MS
+        bigger = mem_ratio > 1 + threshold and now["peak_mem_kb"] - before["peak_mem_kb"] > 64
+        flag = ""
+        if slower or bigger:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<40} best {before['min_ms']:8.2f} -> {now['min_ms']:8.2f} ms ({time_ratio:5.2f}x)  "
+              f"p50 {now['p50_ms']:8.2f} ms  mem {mem_ratio:5.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the equity, nuts and threat paths and app start-up.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks and write JSON")
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--sims", type=int, default=10000)
+
+    cmp_parser = sub.add_parser("compare", help="diff a results file against a baseline")
+    cmp_parser.add_argument("current", nargs="?", default="bench_results.json")
+    cmp_parser.add_argument("--baseline", default=BASELINE_PATH)
+    cmp_parser.add_argument("--threshold", type=float, default=0.25,
+                            help="allowed fractional slowdown before flagging")
+
+    startup_parser = sub.add_parser("startup", help="time imports, warm-up, first run and reruns of app.py")
+    startup_parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "startup":
+        startup(args.repeat)
+    elif args.command == "run":
+        report = run(args.repeat, args.sims)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
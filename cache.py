@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "maxsize", "currsize", "currbytes"],
+    defaults=(0,)
+)
+
+
+def sizeof(value):
+    """
+    Approximate bytes held by a cached result: numpy buffers plus the
+    containers, tuples and scalars around them.
+    """
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is None else 0)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return size + sum(sizeof(v) for v in value)
+    return size
+
+
+class LRUCache:
+    """
+    A thread-safe LRU mapping with the same counters as functools.lru_cache,
+    for results that are produced incrementally and stored once complete.
+    Optionally bounded by total `max_bytes` (see sizeof) and expiring
+    entries `ttl` seconds after they were stored.
+    """
+
+    def __init__(self, maxsize, max_bytes=None, ttl=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = self.misses = 0
+        self.bytes = 0
+        # key -> (value, bytes, expiry)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, key):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._evict(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        size = sizeof(value) if self.max_bytes is not None else 0
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._evict(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = value, size, expiry
+            self.bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                self._evict(next(iter(self._data)))
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data), self.bytes)
+
+    def cache_clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            self.bytes = 0
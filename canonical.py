@@ -0,0 +1,40 @@
+from itertools import permutations
+from hand_eval import to_cards, to_indices
+
+# =====================================================
+# SUIT ISOMORPHISM
+# =====================================================
+# Equity, nuts and threats are unchanged by relabeling suits, so any spot
+# can be mapped onto one representative before it is computed or cached.
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def canonicalize(player_cards, board_cards):
+    """
+    Returns:
+        player (tuple[int]) - hole cards under the canonical suit labels
+        board (tuple[int]) - board cards under the canonical suit labels
+        perm (tuple[int]) - perm[s] is the canonical label of suit s
+    """
+    hero = to_indices(player_cards)
+    board = to_indices(board_cards)
+
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        key = (
+            tuple(sorted(i - i % 4 + perm[i % 4] for i in board)),
+            tuple(sorted(i - i % 4 + perm[i % 4] for i in hero)),
+        )
+        if best is None or key < best[0]:
+            best = key, perm
+
+    (board_key, hero_key), perm = best
+    return tuple(to_cards(hero_key)), tuple(to_cards(board_key)), perm
+
+
+def restore(cards, perm):
+    """
+    Maps canonical cards back to the suits of the original spot.
+    """
+    inverse = [perm.index(s) for s in range(4)]
+    return tuple(to_cards(i - i % 4 + inverse[i % 4] for i in to_indices(cards)))
@@ -0,0 +1,98 @@
+from poker_odds import TIE_SHARE
+
+
+def pot_equity(win, tie, tie_share=TIE_SHARE):
+    """
+    The hero's share of the pot at showdown: every win plus the split
+    part of every tie.
+    """
+    return win + tie * tie_share
+
+
+# =====================================================
+# POT ODDS
+# =====================================================
+def call_decision(
+    win,
+    tie,
+    pot,
+    to_call,
+    hero_stack=None,
+    opponent_stack=None,
+    num_opponents=1,
+    tie_share=TIE_SHARE
+):
+    """
+    Call/fold arithmetic for an equity already worked out. `pot`
+    includes every bet so far, the one being faced too. Stacks are
+    what each player holds before this call; None means uncapped.
+
+    A call is capped at the hero's stack, and a short call only wins
+    as much of the bet as it matches. Folding is worth 0, so call_ev is
+    the gain over folding.
+
+    Implied odds: `implied_needed` is how much more the hero must win on
+    later streets, when ahead, for the call to break even, against
+    `implied_max`, the most the stacks behind can pay: the smaller of
+    the hero's stack left after calling and an opponent's stack, from
+    each of `num_opponents`.
+
+    Returns:
+        dict with
+            call (float) - chips the hero puts in
+            pot_after (float) - pot the hero is playing for after calling
+            equity (float) - pot share at showdown, ties split
+            required_equity (float) - break-even equity for the call
+            pot_odds (float | None) - pot : call ratio, as "x to 1"
+            call_ev, fold_ev (float) - chips, relative to folding
+            action (str) - "call" or "fold"
+            implied_needed (float | None) - chips to win later to break
+                                            even; 0 when already +EV,
+                                            None with no equity
+            implied_max (float | None) - most the stacks behind can pay
+            implied_ok (bool) - implied_needed fits within implied_max
+            implied_equity (float | None) - break-even equity if
+                                            implied_max is won when ahead
+    """
+    call = to_call if hero_stack is None else min(to_call, hero_stack)
+    # A short call returns the unmatched part of the bet to the bettor.
+    pot_after = pot - (to_call - call) + call
+    equity = pot_equity(win, tie, tie_share)
+
+    required = call / pot_after if pot_after else 0.0
+    call_ev = equity * pot_after - call
+
+    implied_max = None
+    if hero_stack is not None or opponent_stack is not None:
+        # The bettor's chips are already in `pot`; only the hero's stack
+        # still shrinks by this call.
+        behind = [] if hero_stack is None else [hero_stack - call]
+        if opponent_stack is not None:
+            behind.append(opponent_stack)
+        implied_max = max(min(behind), 0.0) * (num_opponents if opponent_stack is not None else 1)
+
+    if call_ev >= 0:
+        implied_needed = 0.0
+    elif equity > 0:
+        implied_needed = call / equity - pot_after
+    else:
+        implied_needed = None
+
+    implied_equity = None
+    if implied_max is not None:
+        implied_equity = call / (pot_after + implied_max) if pot_after + implied_max else 0.0
+
+    return {
+        "call": call,
+        "pot_after": pot_after,
+        "equity": equity,
+        "required_equity": required,
+        "pot_odds": (pot_after - call) / call if call else None,
+        "call_ev": call_ev,
+        "fold_ev": 0.0,
+        "action": "call" if call_ev >= 0 else "fold",
+        "implied_needed": implied_needed,
+        "implied_max": implied_max,
+        "implied_ok": implied_needed is not None and (implied_max is None or implied_needed <= implied_max),
+        "implied_equity": implied_equity,
+    }
@@ -0,0 +1,234 @@
+import os
+import numpy as np
+from bisect import bisect_left
+from itertools import combinations, combinations_with_replacement
+from treys import Card, Evaluator
+from treys.lookup import LookupTable
+import instrument
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hand_ranks.npy")
+
+# =====================================================
+# CARD INDICES
+# =====================================================
+# Cards are indexed 0-51 as rank * 4 + suit, with rank 0-12 (2..A) and
+# suit 0-3 (s, h, d, c). treys ints are only converted at the boundary.
+SUIT_INDEX = {1: 0, 2: 1, 4: 2, 8: 3}
+INDEX_TO_CARD = [
+    Card.new(Card.STR_RANKS[i // 4] + "shdc"[i % 4]) for i in range(52)
+]
+CARD_TO_INDEX = {c: i for i, c in enumerate(INDEX_TO_CARD)}
+
+# Every card contributes two additive keys:
+#   RANK_KEY - 5**rank, so the sum encodes the rank multiset (counts <= 4)
+#   SUIT_KEY - one bit per card in a 16-bit lane per suit
+RANK_KEY = np.array([5 ** (i // 4) for i in range(52)], dtype=np.int64)
+SUIT_KEY = np.array([1 << (16 * (i % 4) + i // 4) for i in range(52)], dtype=np.int64)
+
+# One bit per card index, for dead-card masks.
+CARD_MASK = np.array([1 << i for i in range(52)], dtype=np.int64)
+
+CARD_RANK_KEY = {c: int(RANK_KEY[i]) for c, i in CARD_TO_INDEX.items()}
+CARD_SUIT_KEY = {c: int(SUIT_KEY[i]) for c, i in CARD_TO_INDEX.items()}
+
+NO_FLUSH = LookupTable.MAX_HIGH_CARD + 1
+
+
+def to_indices(cards):
+    return [CARD_TO_INDEX[c] for c in cards]
+
+
+def to_cards(indices):
+    return [INDEX_TO_CARD[i] for i in indices]
+
+
+def card_mask(cards):
+    """
+    64-bit mask of treys cards, one bit per card index.
+    """
+    mask = 0
+    for c in cards:
+        mask |= 1 << CARD_TO_INDEX[c]
+    return mask
+
+
+def live_cards(dead):
+    """
+    Card indices not set in the `dead` mask.
+    """
+    return np.flatnonzero(CARD_MASK & dead == 0)
+
+
+def card_combinations(cards, r):
+    """
+    Every r-card subset of `cards` as rows of an (n, r) index array; one
+    empty row for r = 0.
+    """
+    if r == 0:
+        return np.zeros((1, 0), dtype=np.intp)
+    return np.array(list(combinations(cards, r)), dtype=np.intp)
+
+
+# =====================================================
+# LOOKUP TABLES
+# =====================================================
+def _rank_multisets(n):
+    keys = []
+    for combo in combinations_with_replacement(range(13), n):
+        if any(combo.count(r) > 4 for r in set(combo)):
+            continue
+        keys.append(sum(5 ** r for r in combo))
+    return np.array(sorted(keys), dtype=np.int64)
+
+
+def build_tables():
+    """
+    Returns:
+        rank_keys (np.ndarray) - sorted rank-multiset keys for 5-7 cards
+        rank_vals (np.ndarray) - best non-flush score for each key
+        flush_vals (np.ndarray) - best flush score per 13-bit suit mask
+    """
+    lookup = LookupTable()
+
+    # Non-flush: best 5-card score for every rank multiset of 5, 6 and 7
+    # cards, each larger size reduced from the one below it.
+    keys = _rank_multisets(5)
+    vals = np.empty(len(keys), dtype=np.int32)
+    for i, key in enumerate(keys):
+        product = 1
+        for r in range(13):
+            product *= Card.PRIMES[r] ** (int(key) // 5 ** r % 5)
+        vals[i] = lookup.unsuited_lookup[product]
+
+    all_keys, all_vals = [keys], [vals]
+    for n in (6, 7):
+        prev_keys, prev_vals = keys, vals
+        keys = _rank_multisets(n)
+        vals = np.full(len(keys), NO_FLUSH, dtype=np.int32)
+        for r in range(13):
+            has = keys // 5 ** r % 5 > 0
+            sub = np.searchsorted(prev_keys, keys[has] - 5 ** r)
+            vals[has] = np.minimum(vals[has], prev_vals[sub])
+        all_keys.append(keys)
+        all_vals.append(vals)
+
+    rank_keys = np.concatenate(all_keys)
+    order = np.argsort(rank_keys)
+    rank_keys = rank_keys[order]
+    rank_vals = np.concatenate(all_vals)[order]
+
+    # Flush: best 5-card flush in any suit mask with 5+ bits set.
+    flush_vals = np.full(1 << 13, NO_FLUSH, dtype=np.int32)
+    for bits in sorted(range(1 << 13), key=lambda b: bin(b).count("1")):
+        count = bin(bits).count("1")
+        if count == 5:
+            flush_vals[bits] = lookup.flush_lookup[Card.prime_product_from_rankbits(bits)]
+        elif count > 5:
+            flush_vals[bits] = min(
+                flush_vals[bits & ~(1 << r)] for r in range(13) if bits >> r & 1
+            )
+
+    return rank_keys, rank_vals, flush_vals
+
+
+def save_tables(path=TABLE_PATH):
+    """
+    Writes the tables to one int64 .npy file laid out as
+    [len(rank_keys), rank_keys, rank_vals, flush_vals].
+    """
+    rank_keys, rank_vals, flush_vals = build_tables()
+    data = np.concatenate([[len(rank_keys)], rank_keys, rank_vals, flush_vals]).astype(np.int64)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, data)
+    return data
+
+
+_tables = None
+
+
+def load_tables(path=TABLE_PATH):
+    """
+    Memory-maps the on-disk tables, generating the file first if missing.
+    """
+    global _tables
+    if _tables is None:
+        if os.path.exists(path):
+            data = np.load(path, mmap_mode="r")
+        else:
+            try:
+                data = save_tables(path)
+            except OSError:
+                # Read-only deploy: keep the freshly built tables in memory.
+                rank_keys, rank_vals, flush_vals = build_tables()
+                data = np.concatenate([[len(rank_keys)], rank_keys, rank_vals, flush_vals])
+        n = int(data[0])
+        _tables = data[1:n + 1], data[n + 1:2 * n + 1], data[2 * n + 1:]
+    return _tables
+
+
+# =====================================================
+# VECTORIZED EVALUATION
+# =====================================================
+def score_keys(rank_key, suit_key):
+    """
+    Scores hands from their summed RANK_KEY / SUIT_KEY values. Accepts
+    arrays of any shape and returns treys-compatible scores (1 = best).
+    """
+    rank_keys, rank_vals, flush_vals = load_tables()
+    if instrument.ENABLED:
+        instrument.count_evaluation(np.size(rank_key))
+    # Clipped so impossible keys (five of a rank, from deals that are
+    # scored and then discarded) cannot index past the table.
+    scores = rank_vals.take(np.searchsorted(rank_keys, rank_key), mode="clip")
+    for s in range(4):
+        scores = np.minimum(scores, flush_vals[(suit_key >> (16 * s)) & 0x1FFF])
+    return scores
+
+
+def evaluate_indices(indices):
+    """
+    Scores an array of card indices shaped (..., n) with 5 <= n <= 7.
+    """
+    indices = np.asarray(indices)
+    return score_keys(RANK_KEY[indices].sum(-1), SUIT_KEY[indices].sum(-1))
+
+
+# =====================================================
+# DROP-IN EVALUATOR
+# =====================================================
+class TableEvaluator(Evaluator):
+    """
+    treys.Evaluator replacement backed by the precomputed tables. Returns
+    the same 1-7462 scores; rank-class helpers are inherited unchanged.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # memoryviews over the mapped tables give plain-int indexing, which
+        # keeps per-call overhead far below a numpy call.
+        self.rank_keys, self.rank_vals, self.flush_vals = (
+            memoryview(t) for t in load_tables()
+        )
+
+    def evaluate(self, hand, board):
+        if instrument.ENABLED:
+            instrument.count_evaluation(1)
+        rank_key = suit_key = 0
+        for c in hand + board:
+            rank_key += CARD_RANK_KEY[c]
+            suit_key |= CARD_SUIT_KEY[c]
+
+        score = self.rank_vals[bisect_left(self.rank_keys, rank_key)]
+        for shift in (0, 16, 32, 48):
+            bits = (suit_key >> shift) & 0x1FFF
+            if bits.bit_count() >= 5:
+                score = min(score, self.flush_vals[bits])
+        return score
+
+    def evaluate_batch(self, indices):
+        return evaluate_indices(indices)
+
+
+if __name__ == "__main__":
+    save_tables()
+    print(f"Wrote {TABLE_PATH}")
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Set POKER_PERF=1 to time phases, count evaluations and log them. When
+# unset, timed() returns functions untouched and counters are skipped.
+ENABLED = os.environ.get("POKER_PERF", "") not in ("", "0")
+
+logger = logging.getLogger("poker.perf")
+if ENABLED and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Streamlit runs every session's script in its own thread, so counters are
+# kept per thread and one rerun never sees another session's work.
+_local = threading.local()
+
+
+def counters():
+    if not hasattr(_local, "counters"):
+        _local.counters = {"eval_calls": 0, "hands_scored": 0}
+    return _local.counters
+
+
+def count_evaluation(hands):
+    c = counters()
+    c["eval_calls"] += 1
+    c["hands_scored"] += hands
+
+
+def log_event(event, **fields):
+    logger.info(json.dumps({"event": event, **fields}))
+
+
+def timed(fn):
+    """
+    Logs each call's wall time and evaluator work when enabled.
+    """
+    if not ENABLED:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        before = dict(counters())
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            after = counters()
+            log_event(
+                "call",
+                function=fn.__name__,
+                ms=round((time.perf_counter() - start) * 1000, 3),
+                eval_calls=after["eval_calls"] - before["eval_calls"],
+                hands_scored=after["hands_scored"] - before["hands_scored"]
+            )
+    return wrapper
+
+
+class PerfRecorder:
+    """
+    Collects named phases for one script run. `cache_stats` is a callable
+    returning {name: {"hits": .., "misses": ..}} to diff around each phase.
+    """
+
+    def __init__(self, cache_stats=None, enabled=ENABLED):
+        self.enabled = enabled
+        self.cache_stats = cache_stats
+        self.phases = []
+
+    def _cache_totals(self):
+        if self.cache_stats is None:
+            return 0, 0
+        stats = self.cache_stats().values()
+        return sum(s["hits"] for s in stats), sum(s["misses"] for s in stats)
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        before = dict(counters())
+        hits, misses = self._cache_totals()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            after = counters()
+            now_hits, now_misses = self._cache_totals()
+            record = {
+                "phase": name,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+                "eval_calls": after["eval_calls"] - before["eval_calls"],
+                "hands_scored": after["hands_scored"] - before["hands_scored"],
+                "cache_hits": now_hits - hits,
+                "cache_misses": now_misses - misses,
+            }
+            self.phases.append(record)
+            log_event("phase", **record)
+
+    def total_ms(self):
+        return round(sum(p["ms"] for p in self.phases), 3)
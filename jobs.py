@@ -0,0 +1,107 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from poker_odds import cached_stream_equity, cached_sweep_equity
+
+# Threads running odds in the background, shared by every session.
+JOB_WORKERS = int(os.environ.get("POKER_ODDS_JOBS", "2"))
+
+
+# =====================================================
+# BACKGROUND EQUITY
+# =====================================================
+class EquityJob:
+    """
+    One cached_stream_equity run on a worker thread. `snapshot` holds the
+    latest running result; cancel() stops the run after its current batch,
+    and a cancelled run is never written to the cache.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.snapshot = None
+        self.error = None
+        self.future = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    def run(self, player_cards, community_cards, num_opponents, ranges=None):
+        stream = cached_stream_equity(player_cards, community_cards, num_opponents, ranges=ranges)
+        try:
+            for snapshot in stream:
+                self.snapshot = snapshot
+                if self._cancelled.is_set():
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            stream.close()
+            self._done.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Never started: nothing will set the done flag for us.
+        if self.future is not None and self.future.cancel():
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class SweepJob(EquityJob):
+    """
+    One cached_sweep_equity run on a worker thread; `snapshot` is None
+    until the whole sweep is ready. A cancelled sweep still finishes its
+    single run and is cached for the spot.
+    """
+
+    def run(self, player_cards, community_cards, max_opponents):
+        try:
+            self.snapshot = cached_sweep_equity(player_cards, community_cards, max_opponents)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+
+class JobRunner:
+    """
+    Starts equity jobs on a shared thread pool, replacing a session's
+    previous job whenever its inputs change.
+    """
+
+    def __init__(self, workers=JOB_WORKERS):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="equity")
+
+    def submit(self, previous, player_cards, community_cards, num_opponents, ranges=None):
+        """
+        `ranges` is None for random opponents or a tuple of range specs.
+
+        Returns:
+            `previous` if it is for the same spot, else a new EquityJob
+            (with `previous` cancelled)
+        """
+        key = (tuple(player_cards), tuple(community_cards), num_opponents, ranges)
+        return self._replace(previous, EquityJob, key, list(player_cards), list(community_cards), num_opponents, ranges)
+
+    def submit_sweep(self, previous, player_cards, community_cards, max_opponents):
+        """
+        Returns:
+            `previous` if it is for the same spot, else a new SweepJob
+        """
+        key = (tuple(player_cards), tuple(community_cards), max_opponents)
+        return self._replace(previous, SweepJob, key, list(player_cards), list(community_cards), max_opponents)
+
+    def _replace(self, previous, job_class, key, *args):
+        if previous is not None and previous.key == key:
+            return previous
+        if previous is not None:
+            previous.cancel()
+
+        job = job_class(key)
+        job.future = self.executor.submit(job.run, *args)
+        return job
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# Spots the load test draws from; a small pool keeps the cache warm the
+# way repeated common spots do on a shared deployment.
+SPOTS = [
+    ("/equity", {"hole": "AsKh", "board": "", "opponents": 2}),
+    ("/equity", {"hole": "QdQc", "board": "", "opponents": 4}),
+    ("/equity", {"hole": "AhQh", "board": "JhTh9c", "opponents": 2}),
+    ("/equity", {"hole": "KdQd", "board": "8s8h3dJc", "opponents": 2}),
+    ("/equity", {"hole": "7c7d", "board": "As8h2d", "opponents": 3}),
+    ("/analysis", {"hole": "AsKh", "board": "QsJh2d"}),
+    ("/analysis", {"hole": "KdQd", "board": "8s8h3dJc"}),
+    ("/analysis", {"hole": "As9s", "board": "Ks7s2dTh4c"}),
+]
+
+
+async def request(reader, writer, host, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, count, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            path, payload = rng.choice(SPOTS)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, "POST", path, payload)
+            if status != 200:
+                raise RuntimeError(f"{path} returned {status}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, concurrency, requests, seed):
+    latencies = []
+    per_client = max(1, requests // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, per_client, latencies, random.Random(seed + i))
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main(host, port, levels, requests, seed):
+    for concurrency in levels:
+        r = await run_level(host, port, concurrency, requests, seed)
+        reader, writer = await asyncio.open_connection(host, port)
+        _, stats = await request(reader, writer, host, "GET", "/stats")
+        writer.close()
+        print(f"concurrency {r['concurrency']:>4}  {r['requests_per_sec']:9,.0f} req/s  "
+              f"p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  "
+              f"mean batch {stats['mean_batch']:6.2f}  largest {stats['largest_batch']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure server.py throughput at several concurrency levels.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--levels", default="1,4,16,64", help="comma-separated concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per level")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, [int(c) for c in args.levels.split(",")], args.requests, args.seed))
@@ -0,0 +1,127 @@
+import numpy as np
+from itertools import combinations
+from treys.lookup import LookupTable
+from hand_eval import CARD_MASK, RANK_KEY, SUIT_KEY, card_combinations, card_mask, evaluate_indices, live_cards, score_keys, to_cards, to_indices
+
+# Upper score of each rank class, best first: searchsorted on a score
+# gives its class (0 = royal flush .. 9 = high card, as in HAND_RANKS).
+CLASS_BOUNDS = np.array(sorted(LookupTable.MAX_TO_RANK_CLASS), dtype=np.int64)
+
+# Every way to choose 5 of 5, 6 or 7 cards, as column indices.
+FIVE_OF = {n: np.array(list(combinations(range(n), 5)), dtype=np.intp) for n in (5, 6, 7)}
+
+
+def rank_class(scores):
+    return np.searchsorted(CLASS_BOUNDS, scores)
+
+
+# =====================================================
+# BEST FIVE
+# =====================================================
+def best_five(player_cards, board_cards):
+    """
+    The five of the hero's 5-7 cards that make the best hand, scored in
+    one vectorized call.
+
+    Returns:
+        list of 5 treys ints
+    """
+    cards = np.array(to_indices(player_cards + board_cards), dtype=np.intp)
+    subsets = cards[FIVE_OF[len(cards)]]
+    return to_cards(subsets[np.argmin(evaluate_indices(subsets))])
+
+
+# =====================================================
+# OUTS
+# =====================================================
+def _class_odds(classes, current):
+    # {class: probability} for the classes that beat the current one.
+    counts = np.bincount(classes, minlength=len(CLASS_BOUNDS)) / len(classes)
+    return {int(c): float(counts[c]) for c in range(current) if counts[c] > 0}
+
+
+def _clears(hero_scores, runouts, pair_mask, pair_rank, pair_suit):
+    # True where the hero beats every threat holding the runout leaves live.
+    scores = score_keys(
+        pair_rank[None, :] + RANK_KEY[runouts].sum(1)[:, None],
+        pair_suit[None, :] + SUIT_KEY[runouts].sum(1)[:, None]
+    )
+    blocked = CARD_MASK[runouts].sum(1)[:, None] & pair_mask[None, :] != 0
+    scores[blocked] = LookupTable.MAX_HIGH_CARD + 1
+    return hero_scores < scores.min(1)
+
+
+def outs_analysis(player_cards, board_cards, threats=()):
+    """
+    Every unseen next card on the flop or turn, plus every turn-river
+    pair on the flop, scored in one pass each.
+
+    `threats` are holdings currently beating the hero (as in
+    analyze_board's threats); a card "clears" them when the hero ends
+    ahead of every one of them that is still live.
+
+    Returns:
+        dict with
+            score, rank_class (int) - the hero's hand now
+            best_five (list[int]) - the five cards making it
+            outs (dict) - {rank_class: [cards]} next cards improving the
+                          hero to a better class
+            next_card (dict) - {rank_class: probability} on the next card
+            by_river (dict | None) - {rank_class: probability} after both
+                                     cards, on the flop only
+            threat_outs (list[int]) - next cards clearing every threat
+            clear_next (float | None) - probability of the above
+            clear_by_river (float | None) - the same after the river
+    """
+    hero = to_indices(player_cards)
+    board = to_indices(board_cards)
+    unseen = live_cards(card_mask(player_cards + board_cards))
+
+    hand_rank = RANK_KEY[hero + board].sum()
+    hand_suit = SUIT_KEY[hero + board].sum()
+    score = int(score_keys(hand_rank, hand_suit))
+    current = int(rank_class(score))
+
+    next_scores = score_keys(hand_rank + RANK_KEY[unseen], hand_suit + SUIT_KEY[unseen])
+    next_classes = rank_class(next_scores)
+    outs = {}
+    for card, cls in zip(unseen, next_classes):
+        if cls < current:
+            outs.setdefault(int(cls), []).append(to_cards([card])[0])
+
+    by_river = runouts = river_scores = None
+    if len(board) == 3:
+        runouts = card_combinations(unseen, 2)
+        river_scores = score_keys(
+            hand_rank + RANK_KEY[runouts].sum(1),
+            hand_suit + SUIT_KEY[runouts].sum(1)
+        )
+        by_river = _class_odds(rank_class(river_scores), current)
+
+    threat_outs, clear_next, clear_by_river = [], None, None
+    if len(threats):
+        pairs = np.array([to_indices(h) for h in threats], dtype=np.intp)
+        board_rank = RANK_KEY[board].sum()
+        board_suit = SUIT_KEY[board].sum()
+        pair_rank = board_rank + RANK_KEY[pairs].sum(1)
+        pair_suit = board_suit + SUIT_KEY[pairs].sum(1)
+        pair_mask = CARD_MASK[pairs].sum(1)
+
+        clear = _clears(next_scores, unseen[:, None], pair_mask, pair_rank, pair_suit)
+        threat_outs = to_cards(unseen[clear])
+        clear_next = float(clear.mean())
+        if runouts is not None:
+            clear_by_river = float(_clears(river_scores, runouts, pair_mask, pair_rank, pair_suit).mean())
+
+    return {
+        "score": score,
+        "rank_class": current,
+        "best_five": best_five(player_cards, board_cards),
+        "outs": outs,
+        "next_card": _class_odds(next_classes, current),
+        "by_river": by_river,
+        "threat_outs": threat_outs,
+        "clear_next": clear_next,
+        "clear_by_river": clear_by_river,
+    }
+
@@ -1,52 +1,914 @@
-from treys import Card, Deck, Evaluator
-import random
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from math import comb, prod
+from cache import LRUCache
+from canonical import canonicalize, restore
+from instrument import timed
+from hand_eval import CARD_MASK, CARD_TO_INDEX, RANK_KEY, SUIT_KEY, card_combinations, card_mask, live_cards, load_tables, score_keys, to_cards, to_indices
+from preflop import MAX_OPPONENTS, load_table, preflop_equity
+from ranges import range_equity, stream_range_equity
 
-def simulate_win_probability(
+# Simulations dealt per vectorized batch; bounds memory for large runs.
+BATCH_SIZE = 20000
+
+# Spots with at most this many distinct deals are enumerated exactly
+# instead of sampled (heads-up flop is ~1.07M, two-way river ~450k).
+EXACT_LIMIT = 1_500_000
+
+# Adaptive mode: stop once the 95% confidence half-width of the equity
+# is within TARGET_MARGIN, sampling ADAPTIVE_BATCH deals at a time.
+TARGET_MARGIN = 0.005
+MIN_SIMS = 2000
+MAX_SIMS = 200000
+ADAPTIVE_BATCH = 2000
+
+# Known-hands showdowns enumerate runouts exactly up to this many; each
+# runout costs one score per hand, so preflop spots are sampled instead.
+SHOWDOWN_EXACT_LIMIT = 250_000
+
+# Pot share assumed for a tie when the sweep has no ties to measure:
+# most ties are two-way.
+TIE_SHARE = 0.5
+
+# Processes used for fixed-size Monte Carlo runs (simulate_equity, as used
+# by the HTTP service and cached_equity); 1 keeps simulation in-process.
+# The app's adaptive odds stay on its job threads: spawned workers would
+# re-import the Streamlit script as their __main__.
+WORKERS = int(os.environ.get("POKER_ODDS_WORKERS", "1"))
+
+# Results cache shared by every session in the process: at most
+# CACHE_SIZE spots and POKER_CACHE_MB megabytes, each kept for
+# POKER_CACHE_TTL seconds.
+CACHE_SIZE = 4096
+CACHE_BYTES = int(float(os.environ.get("POKER_CACHE_MB", "64")) * 2 ** 20)
+CACHE_TTL = float(os.environ.get("POKER_CACHE_TTL", "3600"))
+
+
+class Dealer:
+    """
+    Deals `count` cards per row from `live` with a partial Fisher-Yates
+    shuffle. The deck, random and swap buffers are allocated once and
+    reused for every batch of up to `sims` rows.
+    """
+
+    def __init__(self, live, count, sims=BATCH_SIZE):
+        self.live = np.asarray(live, dtype=np.uint8)
+        self.count = count
+        self.deck = np.empty((sims, len(live)), dtype=np.uint8)
+        self.rand = np.empty(sims)
+        self.pos = np.empty(sims, dtype=np.intp)
+        self.swap = np.empty(sims, dtype=np.uint8)
+        self.base = np.arange(sims) * len(live)
+
+    def deal(self, rng, sims):
+        """
+        Returns a (sims, count) view of the buffer, valid until the next deal.
+        """
+        n = len(self.live)
+        deck = self.deck[:sims]
+        flat = deck.reshape(-1)
+        rand, pos, swap = self.rand[:sims], self.pos[:sims], self.swap[:sims]
+
+        deck[:] = self.live
+        for j in range(self.count):
+            # Swap column j with a uniform pick from columns j..n-1.
+            rng.random(out=rand)
+            rand *= n - j
+            pos[:] = rand
+            pos += self.base[:sims]
+            pos += j
+            np.take(flat, pos, out=swap)
+            flat[pos] = deck[:, j]
+            deck[:, j] = swap
+        return deck[:, :self.count]
+
+
+def _simulate_shares(rng, dealer, hero, board, num_opponents, sims):
+    # Hero's share of the pot in each simulation: 1 for a win, 1/k for a
+    # k-way split and 0 for a loss.
+    missing = 5 - len(board)
+    dealt = dealer.deal(rng, sims)
+
+    board_rank = RANK_KEY[board].sum() + RANK_KEY[dealt[:, :missing]].sum(1)
+    board_suit = SUIT_KEY[board].sum() + SUIT_KEY[dealt[:, :missing]].sum(1)
+
+    my_score = score_keys(
+        board_rank + RANK_KEY[hero].sum(),
+        board_suit + SUIT_KEY[hero].sum()
+    )
+
+    opps = dealt[:, missing:].reshape(sims, num_opponents, 2)
+    opp_scores = score_keys(
+        board_rank[:, None] + RANK_KEY[opps].sum(-1),
+        board_suit[:, None] + SUIT_KEY[opps].sum(-1)
+    )
+    best_opponent = opp_scores.min(1)
+    tied = (opp_scores == my_score[:, None]).sum(1)
+
+    return np.where(my_score <= best_opponent, 1.0 / (1 + tied), 0.0)
+
+
+def _simulate_batch(rng, dealer, hero, board, num_opponents, sims):
+    shares = _simulate_shares(rng, dealer, hero, board, num_opponents, sims)
+    wins = int((shares == 1).sum())
+    losses = int((shares == 0).sum())
+    return wins, sims - wins - losses, losses
+
+
+def count_deals(num_board, num_opponents):
+    """
+    Number of distinct (runout, opponent hands) deals for a spot, with
+    opponents treated as interchangeable.
+    """
+    live = 52 - 2 - num_board
+    missing = 5 - num_board
+    pairings = prod(range(1, 2 * num_opponents, 2))
+    return comb(live, missing) * comb(live - missing, 2 * num_opponents) * pairings
+
+
+def _opponent_hands(pairs, pair_mask, num_opponents):
+    # Every unordered set of `num_opponents` disjoint hole-card pairs, as
+    # indices into `pairs`, grown one pair at a time in increasing order.
+    hands = np.arange(len(pairs))[:, None]
+    mask = pair_mask.copy()
+    for _ in range(num_opponents - 1):
+        last, nxt = np.nonzero(
+            (np.arange(len(pairs))[None, :] > hands[:, -1:])
+            & (mask[:, None] & pair_mask[None, :] == 0)
+        )
+        hands = np.column_stack([hands[last], nxt])
+        mask = mask[last] | pair_mask[nxt]
+    return hands, mask
+
+
+@timed
+def enumerate_equity(player_cards, community_cards, num_opponents):
+    """
+    Exact equity of `player_cards` over every runout and opponent deal.
+
+    Returns:
+        (win, tie, lose) fractions
+    """
+    hero = np.array(to_indices(player_cards), dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    live = live_cards(card_mask(player_cards + community_cards))
+
+    runouts = card_combinations(live, 5 - len(board))
+    runout_mask = CARD_MASK[runouts].sum(1)
+    board_rank = RANK_KEY[board].sum() + RANK_KEY[runouts].sum(1)
+    board_suit = SUIT_KEY[board].sum() + SUIT_KEY[runouts].sum(1)
+    my_scores = score_keys(
+        board_rank + RANK_KEY[hero].sum(),
+        board_suit + SUIT_KEY[hero].sum()
+    )
+
+    pairs = card_combinations(live, 2)
+    pair_mask = CARD_MASK[pairs].sum(1)
+    pair_rank = RANK_KEY[pairs].sum(1)
+    pair_suit = SUIT_KEY[pairs].sum(1)
+    hands, hand_mask = _opponent_hands(pairs, pair_mask, num_opponents)
+
+    wins = ties = total = 0
+    step = max(1, BATCH_SIZE * 50 // max(len(pairs), len(hands)))
+    for start in range(0, len(runouts), step):
+        chunk = slice(start, start + step)
+        # Each hole-card pair is scored once per runout; pairs that clash
+        # with the runout are dropped with the deals that contain them.
+        pair_scores = score_keys(
+            board_rank[chunk, None] + pair_rank[None, :],
+            board_suit[chunk, None] + pair_suit[None, :]
+        )
+        r, o = np.nonzero(runout_mask[chunk, None] & hand_mask[None, :] == 0)
+        best_opponent = pair_scores[r[:, None], hands[o]].min(1)
+        mine = my_scores[r + start]
+        wins += int((mine < best_opponent).sum())
+        ties += int((mine == best_opponent).sum())
+        total += len(r)
+
+    return wins / total, ties / total, (total - wins - ties) / total
+
+
+def _monte_carlo_counts(player_cards, community_cards, num_opponents, simulations, seed):
+    rng = np.random.default_rng(seed)
+    hero = np.array(to_indices(player_cards), dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    dealer = Dealer(
+        live_cards(card_mask(player_cards + community_cards)),
+        5 - len(board) + 2 * num_opponents,
+        min(BATCH_SIZE, simulations)
+    )
+
+    wins = ties = losses = 0
+    done = 0
+    while done < simulations:
+        sims = min(BATCH_SIZE, simulations - done)
+        w, t, l = _simulate_batch(rng, dealer, hero, board, num_opponents, sims)
+        wins += w
+        ties += t
+        losses += l
+        done += sims
+    return wins, ties, losses
+
+
+@timed
+def monte_carlo_equity(
     player_cards,
     community_cards,
     num_opponents,
-    simulations=10000
+    simulations=10000,
+    seed=None
 ):
-    evaluator = Evaluator()
+    """
+    Vectorized Monte Carlo equity of `player_cards` against random hands.
+
+    Returns:
+        (win, tie, lose) fractions
+    """
+    wins, ties, losses = _monte_carlo_counts(
+        player_cards, community_cards, num_opponents, simulations, seed
+    )
+    return wins / simulations, ties / simulations, losses / simulations
+
+
+# =====================================================
+# PROCESS POOL
+# =====================================================
+# One pool per size, created on first use and never shut down, so callers
+# asking for different sizes cannot cancel each other's work.
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers=WORKERS):
+    """
+    The process pool of `workers` processes shared by every caller in this
+    server process.
+    """
+    with _executor_lock:
+        if workers not in _executors:
+            # spawn rather than fork: the Streamlit server is multi-threaded.
+            _executors[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executors[workers]
+
+
+@timed
+def parallel_equity(
+    player_cards,
+    community_cards,
+    num_opponents,
+    simulations=10000,
+    seed=None,
+    workers=WORKERS
+):
+    """
+    monte_carlo_equity split across `workers` processes. Each worker seeds
+    from a child of one SeedSequence, so a given (seed, workers) pair always
+    reproduces the same result.
+
+    Returns:
+        (win, tie, lose) fractions
+    """
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [simulations // workers + (i < simulations % workers) for i in range(workers)]
+
+    executor = get_executor(workers)
+    futures = [
+        executor.submit(
+            _monte_carlo_counts,
+            list(player_cards), list(community_cards), num_opponents, n, s
+        )
+        for n, s in zip(shares, seeds) if n
+    ]
+
     wins = ties = losses = 0
+    for f in futures:
+        w, t, l = f.result()
+        wins += w
+        ties += t
+        losses += l
+    return wins / simulations, ties / simulations, losses / simulations
 
-    for _ in range(simulations):
-        deck = Deck()
 
-        # Remove known cards from deck
-        known = player_cards + community_cards
-        for c in known:
-            deck.cards.remove(c)
+def simulate_equity(
+    player_cards,
+    community_cards,
+    num_opponents,
+    simulations=10000,
+    seed=None,
+    exact_limit=EXACT_LIMIT,
+    workers=None,
+    ranges=None
+):
+    """
+    Equity of `player_cards` against random hands. Preflop spots come from
+    the precomputed table, spots with at most `exact_limit` deals are
+    enumerated exactly and everything else is sampled, across `workers`
+    processes when more than one is configured.
 
-        # Draw opponent hands
-        opponents = []
-        for _ in range(num_opponents):
-            opponents.append([deck.draw(1)[0], deck.draw(1)[0]])
+    `ranges` gives opponents weighted ranges instead (see ranges.parse_range);
+    opponents beyond the end of the list hold random hands.
 
-        # Complete community cards
-        board = community_cards[:]
-        while len(board) < 5:
-            board.append(deck.draw(1)[0])
+    Returns:
+        (win, tie, lose) fractions
+    """
+    if ranges is not None:
+        ranges = list(ranges) + [None] * (num_opponents - len(ranges))
+        return range_equity(player_cards, community_cards, ranges, simulations, seed)
 
-        # Evaluate player
-        player_score = evaluator.evaluate(board, player_cards)
+    if not community_cards:
+        cached = preflop_equity(player_cards, num_opponents)
+        if cached is not None:
+            return cached
 
-        opponent_scores = [
-            evaluator.evaluate(board, opp) for opp in opponents
-        ]
+    if count_deals(len(community_cards), num_opponents) <= exact_limit:
+        return enumerate_equity(player_cards, community_cards, num_opponents)
 
-        best_opponent = min(opponent_scores)
+    workers = WORKERS if workers is None else workers
+    if workers > 1:
+        return parallel_equity(
+            player_cards, community_cards, num_opponents, simulations, seed, workers
+        )
+    return monte_carlo_equity(
+        player_cards, community_cards, num_opponents, simulations, seed
+    )
 
-        if player_score < best_opponent:
-            wins += 1
-        elif player_score == best_opponent:
-            ties += 1
-        else:
-            losses += 1
 
-    total = wins + ties + losses
+def simulate_win_probability(
+    player_cards,
+    community_cards,
+    num_opponents,
+    simulations=10000,
+    seed=None
+):
+    win, tie, lose = simulate_equity(
+        player_cards, community_cards, num_opponents, simulations, seed
+    )
     return {
-        "win": wins / total,
-        "tie": ties / total,
-        "lose": losses / total
+        "win": win,
+        "tie": tie,
+        "lose": lose
     }
+
+
+def stream_equity(
+    player_cards,
+    community_cards,
+    num_opponents,
+    target=TARGET_MARGIN,
+    min_sims=MIN_SIMS,
+    max_sims=MAX_SIMS,
+    batch=ADAPTIVE_BATCH,
+    seed=None,
+    ranges=None
+):
+    """
+    Yields a running snapshot after every `batch` deals until the 95%
+    confidence half-width of the equity (pot share, splits counted
+    fractionally) is at most `target`, bounded by `min_sims` and
+    `max_sims`. Exactly enumerated spots yield once with a margin of 0;
+    preflop table lookups yield once with a margin of None.
+
+    `ranges` streams against weighted opponent ranges instead, as in
+    simulate_equity.
+
+    Yields:
+        dict with win, tie, lose, margin and simulations
+    """
+    if ranges is not None:
+        ranges = list(ranges) + [None] * (num_opponents - len(ranges))
+        yield from stream_range_equity(
+            player_cards, community_cards, ranges, target, min_sims, max_sims, seed=seed
+        )
+        return
+
+    if not community_cards:
+        cached = preflop_equity(player_cards, num_opponents)
+        if cached is not None:
+            win, tie, lose = cached
+            yield {"win": win, "tie": tie, "lose": lose, "margin": None, "simulations": 0}
+            return
+
+    deals = count_deals(len(community_cards), num_opponents)
+    if deals <= EXACT_LIMIT:
+        win, tie, lose = enumerate_equity(player_cards, community_cards, num_opponents)
+        yield {"win": win, "tie": tie, "lose": lose, "margin": 0.0, "simulations": deals}
+        return
+
+    rng = np.random.default_rng(seed)
+    hero = np.array(to_indices(player_cards), dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    dealer = Dealer(
+        live_cards(card_mask(player_cards + community_cards)),
+        5 - len(board) + 2 * num_opponents,
+        batch
+    )
+
+    wins = losses = done = 0
+    total = total_sq = 0.0
+    while done < max_sims:
+        shares = _simulate_shares(rng, dealer, hero, board, num_opponents, min(batch, max_sims - done))
+        wins += int((shares == 1).sum())
+        losses += int((shares == 0).sum())
+        total += float(shares.sum())
+        total_sq += float((shares ** 2).sum())
+        done += len(shares)
+
+        mean = total / done
+        margin = 1.96 * np.sqrt(max(total_sq / done - mean ** 2, 0.0) / done)
+        yield {
+            "win": wins / done,
+            "tie": (done - wins - losses) / done,
+            "lose": losses / done,
+            "margin": float(margin),
+            "simulations": done
+        }
+        if done >= min_sims and margin <= target:
+            break
+
+
+@timed
+def adaptive_equity(
+    player_cards,
+    community_cards,
+    num_opponents,
+    target=TARGET_MARGIN,
+    min_sims=MIN_SIMS,
+    max_sims=MAX_SIMS,
+    batch=ADAPTIVE_BATCH,
+    seed=None,
+    ranges=None
+):
+    """
+    The final snapshot of stream_equity.
+
+    Returns:
+        dict with win, tie, lose, margin and simulations
+    """
+    for result in stream_equity(
+        player_cards, community_cards, num_opponents,
+        target, min_sims, max_sims, batch, seed, ranges
+    ):
+        pass
+    return result
+
+
+# =====================================================
+# OPPONENT SWEEP
+# =====================================================
+@timed
+def sweep_equity(
+    player_cards,
+    community_cards,
+    max_opponents=MAX_OPPONENTS,
+    simulations=20000,
+    seed=None
+):
+    """
+    Equity against every table size from 1 to `max_opponents` in one
+    simulation: each deal has `max_opponents` hands and the hero is
+    scored against the first k of them for every k. Preflop counts in
+    the precomputed table are read from it instead.
+
+    tie_share is the average fraction of the pot the hero takes when
+    tied for best, split with however many opponents tied too; it is
+    TIE_SHARE when no ties were dealt or nothing was simulated.
+
+    Returns:
+        {num_opponents: (win, tie, lose, tie_share)} for 1..max_opponents
+    """
+    table = {}
+    if not community_cards:
+        table = {k: preflop_equity(player_cards, k) for k in range(1, max_opponents + 1)}
+        table = {k: v for k, v in table.items() if v is not None}
+        if len(table) == max_opponents:
+            return {k: v + (TIE_SHARE,) for k, v in table.items()}
+
+    rng = np.random.default_rng(seed)
+    hero = np.array(to_indices(player_cards), dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    missing = 5 - len(board)
+    dealer = Dealer(
+        live_cards(card_mask(player_cards + community_cards)),
+        missing + 2 * max_opponents,
+        min(BATCH_SIZE, simulations)
+    )
+
+    wins = np.zeros(max_opponents)
+    ties = np.zeros(max_opponents)
+    tie_pots = np.zeros(max_opponents)
+    done = 0
+    while done < simulations:
+        sims = min(BATCH_SIZE, simulations - done)
+        dealt = dealer.deal(rng, sims)
+        board_rank = RANK_KEY[board].sum() + RANK_KEY[dealt[:, :missing]].sum(1)
+        board_suit = SUIT_KEY[board].sum() + SUIT_KEY[dealt[:, :missing]].sum(1)
+        my_score = score_keys(board_rank + RANK_KEY[hero].sum(), board_suit + SUIT_KEY[hero].sum())
+
+        opps = dealt[:, missing:].reshape(sims, max_opponents, 2)
+        opp_scores = score_keys(
+            board_rank[:, None] + RANK_KEY[opps].sum(-1),
+            board_suit[:, None] + SUIT_KEY[opps].sum(-1)
+        )
+        # Best score among the first k opponents, for every k at once.
+        best = np.minimum.accumulate(opp_scores, axis=1)
+        tied = my_score[:, None] == best
+        # On a tie every opponent matching the hero shares the pot.
+        splits = np.cumsum(opp_scores == my_score[:, None], axis=1) + 1
+        wins += (my_score[:, None] < best).sum(0)
+        ties += tied.sum(0)
+        tie_pots += np.where(tied, 1 / splits, 0.0).sum(0)
+        done += sims
+
+    tie_shares = np.divide(tie_pots, ties, out=np.full(max_opponents, TIE_SHARE), where=ties > 0)
+    return {
+        k: (table.get(k) or (
+            float(wins[k - 1] / done),
+            float(ties[k - 1] / done),
+            float(1 - (wins[k - 1] + ties[k - 1]) / done)
+        )) + (float(tie_shares[k - 1]),)
+        for k in range(1, max_opponents + 1)
+    }
+
+
+# =====================================================
+# SHOWDOWN EQUITY
+# =====================================================
+def _showdown_shares(board_rank, board_suit, hand_rank, hand_suit):
+    # Each player's pot share per runout: winners split the pot evenly.
+    scores = score_keys(
+        board_rank[:, None] + hand_rank[None, :],
+        board_suit[:, None] + hand_suit[None, :]
+    )
+    winners = scores == scores.min(1, keepdims=True)
+    return winners, winners / winners.sum(1, keepdims=True)
+
+
+@timed
+def showdown_equity(
+    hands,
+    community_cards=(),
+    dead_cards=(),
+    simulations=100000,
+    seed=None,
+    exact_limit=SHOWDOWN_EXACT_LIMIT
+):
+    """
+    All-in equity for several known hands: every runout of the board is
+    enumerated when there are at most `exact_limit` of them, otherwise
+    `simulations` runouts are sampled.
+
+    Returns:
+        list with one dict per hand:
+            win (float) - share of runouts won outright
+            tie (float) - share of runouts split with others
+            equity (float) - expected share of the pot, splits included
+            simulations (int) - runouts scored
+            exact (bool) - whether every runout was enumerated
+    """
+    if len(hands) < 2:
+        raise ValueError("need at least two hands")
+    known = [c for h in hands for c in h] + list(community_cards) + list(dead_cards)
+    if len(set(known)) != len(known):
+        raise ValueError("a card appears twice among the hands, board and dead cards")
+
+    hand_idx = np.array([to_indices(h) for h in hands], dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    hand_rank = RANK_KEY[hand_idx].sum(1)
+    hand_suit = SUIT_KEY[hand_idx].sum(1)
+    live = live_cards(card_mask(known))
+    missing = 5 - len(board)
+
+    wins = np.zeros(len(hands))
+    ties = np.zeros(len(hands))
+    equity = np.zeros(len(hands))
+    exact = comb(len(live), missing) <= exact_limit
+
+    if exact:
+        runouts = card_combinations(live, missing)
+        total = len(runouts)
+        step = BATCH_SIZE * 10
+        batches = (runouts[i:i + step] for i in range(0, total, step))
+    else:
+        rng = np.random.default_rng(seed)
+        dealer = Dealer(live, missing, min(BATCH_SIZE, simulations))
+        total = simulations
+        batches = (
+            dealer.deal(rng, min(BATCH_SIZE, simulations - done))
+            for done in range(0, simulations, BATCH_SIZE)
+        )
+
+    for runout in batches:
+        winners, shares = _showdown_shares(
+            RANK_KEY[board].sum() + RANK_KEY[runout].sum(1),
+            SUIT_KEY[board].sum() + SUIT_KEY[runout].sum(1),
+            hand_rank,
+            hand_suit
+        )
+        split = winners.sum(1, keepdims=True) > 1
+        wins += (winners & ~split).sum(0)
+        ties += (winners & split).sum(0)
+        equity += shares.sum(0)
+
+    return [
+        {
+            "win": float(w / total),
+            "tie": float(t / total),
+            "equity": float(e / total),
+            "simulations": total,
+            "exact": exact
+        }
+        for w, t, e in zip(wins, ties, equity)
+    ]
+
+
+# =====================================================
+# NUTS + THREATS
+# =====================================================
+class StreetState:
+    """
+    Every opponent holding still live against the hero and the board so
+    far, with its board-plus-hole rank / suit keys. Adding a card drops the
+    holdings it blocks and shifts the keys, so a new street only rescores
+    what is left instead of rebuilding the holdings from the deck.
+    """
+
+    def __init__(self, player, board=()):
+        self.player = list(player)
+        self.board = []
+        hero = to_indices(player)
+        self.hero_rank = int(RANK_KEY[hero].sum())
+        self.hero_suit = int(SUIT_KEY[hero].sum())
+
+        self.pairs = card_combinations(live_cards(card_mask(player)), 2)
+        self.pair_mask = CARD_MASK[self.pairs].sum(1)
+        self.pair_rank = RANK_KEY[self.pairs].sum(1)
+        self.pair_suit = SUIT_KEY[self.pairs].sum(1)
+        self._analysis = None
+        for card in board:
+            self.add_card(card)
+
+    def add_card(self, card):
+        i = CARD_TO_INDEX[card]
+        keep = self.pair_mask & CARD_MASK[i] == 0
+        self.pairs = self.pairs[keep]
+        self.pair_mask = self.pair_mask[keep]
+        self.pair_rank = self.pair_rank[keep] + RANK_KEY[i]
+        self.pair_suit = self.pair_suit[keep] + SUIT_KEY[i]
+        self.hero_rank += int(RANK_KEY[i])
+        self.hero_suit += int(SUIT_KEY[i])
+        self.board.append(card)
+        self._analysis = None
+
+    def extends(self, player, board):
+        """
+        True if this state can reach (player, board) by adding cards.
+        """
+        return (
+            list(player) == self.player
+            and list(board[:len(self.board)]) == self.board
+        )
+
+    def analysis(self):
+        """
+        analyze_board for the current board, computed once per street.
+        """
+        if self._analysis is None:
+            self._analysis = _analyze_state(self)
+        return self._analysis
+
+
+def advance_street(state, player, board):
+    """
+    Brings `state` up to (player, board), adding only the new board cards.
+    Starts over when the hand changed or a board card was taken back.
+
+    Returns:
+        StreetState for (player, board)
+    """
+    if state is None or not state.extends(player, board):
+        return StreetState(player, board)
+    for card in board[len(state.board):]:
+        state.add_card(card)
+    return state
+
+
+@timed
+def _analyze_state(state):
+    hero_score = int(score_keys(state.hero_rank, state.hero_suit))
+    return _summarize(state.pairs, score_keys(state.pair_rank, state.pair_suit), hero_score)
+
+
+def _summarize(pairs, scores, hero_score):
+    order = np.argsort(scores, kind="stable")
+    scores = scores[order]
+    pairs = pairs[order]
+
+    best = int(scores[0])
+    beats = int(np.searchsorted(scores, hero_score))
+    ties = int(np.searchsorted(scores, hero_score, side="right")) - beats
+
+    return {
+        "hero_score": hero_score,
+        "scores": scores,
+        "best": best,
+        "nuts": [tuple(to_cards(p)) for p in pairs[scores == best]],
+        "threats": [(tuple(to_cards(p)), int(sc)) for p, sc in zip(pairs[:beats], scores[:beats])],
+        "beats": beats,
+        "ties": ties,
+        "loses": len(scores) - beats - ties
+    }
+
+
+def analyze_board(player, board):
+    """
+    Scores every opponent holding on `board` once.
+
+    Returns:
+        dict with
+            hero_score (int)
+            scores (np.ndarray) - every holding's score, best first
+            best (int) - the nut score
+            nuts (list[tuple]) - holdings that make the nuts
+            threats (list[tuple]) - (holding, score) beating the hero, best first
+            beats, ties, loses (int) - holdings that beat / tie / lose to the hero
+    """
+    return StreetState(player, board).analysis()
+
+
+@timed
+def analyze_boards(spots):
+    """
+    analyze_board for many (player, board) spots, with every holding of
+    every spot scored in one score_keys call.
+
+    Returns:
+        list of analyze_board dicts, in the order of `spots`
+    """
+    states = [StreetState(player, board) for player, board in spots]
+    if not states:
+        return []
+    scores = score_keys(
+        np.concatenate([s.pair_rank for s in states] + [[s.hero_rank for s in states]]),
+        np.concatenate([s.pair_suit for s in states] + [[s.hero_suit for s in states]])
+    )
+    hero_scores = scores[-len(states):]
+    pair_scores = np.split(scores[:-len(states)], np.cumsum([len(s.pairs) for s in states])[:-1])
+    return [
+        _summarize(s.pairs, sc, int(hero))
+        for s, sc, hero in zip(states, pair_scores, hero_scores)
+    ]
+
+
+def find_nuts(board, player):
+    analysis = analyze_board(player, board)
+    return analysis["best"], analysis["nuts"]
+
+
+def hands_that_beat(player, board, limit=9):
+    return analyze_board(player, board)["threats"][:limit]
+
+
+# =====================================================
+# CANONICAL CACHES
+# =====================================================
+# Results are cached on the suit-canonical spot; cards in cached results
+# are in canonical suits and mapped back with restore() on the way out.
+# Keys are (kind, player, board, ...) tuples of treys ints, so every kind
+# shares one memory budget.
+_results = LRUCache(CACHE_SIZE, CACHE_BYTES, CACHE_TTL)
+
+
+def cached_equity(player_cards, community_cards, num_opponents, simulations=10000):
+    player, board, _ = canonicalize(player_cards, community_cards)
+    key = ("equity", player, board, num_opponents, simulations)
+    result = _results.get(key)
+    if result is None:
+        result = simulate_equity(list(player), list(board), num_opponents, simulations)
+        _results.put(key, result)
+    return result
+
+
+def cached_stream_equity(player_cards, community_cards, num_opponents, target=TARGET_MARGIN, ranges=None):
+    """
+    stream_equity behind the canonical cache: a cached spot yields its
+    final result once; otherwise snapshots stream and the last one is
+    cached only if the run is consumed to the end.
+
+    `ranges` (a tuple of range spec strings) may name exact suits, so
+    those runs are cached on the spot as dealt rather than canonicalized.
+    """
+    if ranges is None:
+        player, board, _ = canonicalize(player_cards, community_cards)
+    else:
+        player, board = tuple(player_cards), tuple(community_cards)
+    key = ("stream", player, board, num_opponents, target, ranges)
+    result = _results.get(key)
+    if result is not None:
+        yield dict(result)
+        return
+
+    for result in stream_equity(list(player), list(board), num_opponents, target, ranges=ranges):
+        yield result
+    _results.put(key, dict(result))
+
+
+def cached_adaptive_equity(player_cards, community_cards, num_opponents, target=TARGET_MARGIN, ranges=None):
+    for result in cached_stream_equity(player_cards, community_cards, num_opponents, target, ranges):
+        pass
+    return result
+
+
+def _restore_analysis(analysis, perm):
+    return dict(
+        analysis,
+        nuts=[restore(h, perm) for h in analysis["nuts"]],
+        threats=[(restore(h, perm), sc) for h, sc in analysis["threats"]]
+    )
+
+
+def cached_analysis(player, board):
+    player, board, perm = canonicalize(player, board)
+    key = ("analysis", player, board)
+    analysis = _results.get(key)
+    if analysis is None:
+        analysis = analyze_board(list(player), list(board))
+        _results.put(key, analysis)
+    return _restore_analysis(analysis, perm)
+
+
+def cached_analyses(spots):
+    """
+    cached_analysis for many (player, board) spots; the ones not cached
+    are scored together by analyze_boards.
+    """
+    canonical = [canonicalize(player, board) for player, board in spots]
+    keys = [("analysis", player, board) for player, board, _ in canonical]
+    found = [_results.get(key) for key in keys]
+
+    missing = list(dict.fromkeys(key for key, analysis in zip(keys, found) if analysis is None))
+    computed = dict(zip(missing, analyze_boards([(list(k[1]), list(k[2])) for k in missing])))
+    for key, analysis in computed.items():
+        _results.put(key, analysis)
+
+    return [
+        _restore_analysis(analysis if analysis is not None else computed[key], perm)
+        for key, analysis, (_, _, perm) in zip(keys, found, canonical)
+    ]
+
+
+def cached_sweep_equity(player_cards, community_cards, max_opponents=MAX_OPPONENTS, simulations=20000):
+    player, board, _ = canonicalize(player_cards, community_cards)
+    key = ("sweep", player, board, max_opponents, simulations)
+    result = _results.get(key)
+    if result is None:
+        result = sweep_equity(list(player), list(board), max_opponents, simulations)
+        _results.put(key, result)
+    return result
+
+
+def cached_nuts(board, player):
+    analysis = cached_analysis(player, board)
+    return analysis["best"], analysis["nuts"]
+
+
+def cached_threats(player, board, limit=9):
+    return cached_analysis(player, board)["threats"][:limit]
+
+
+def cache_stats():
+    """
+    Hit/miss counters, entries and bytes held by the shared results cache.
+    """
+    return {"results": _results.cache_info()._asdict()}
+
+
+# =====================================================
+# WARM-UP
+# =====================================================
+def warm_up():
+    """
+    Maps the lookup and preflop tables and runs each hot path once on a
+    fixed spot, so the first real request does not pay for page faults
+    and first-call setup. Bypasses the results cache.
+
+    Returns:
+        {step: ms} for each warm-up step
+    """
+    hero, board = to_cards([48, 45]), to_cards([40, 37, 2, 21, 30])
+    steps = (
+        ("lookup_tables", load_tables),
+        ("preflop_table", load_table),
+        ("analysis", lambda: analyze_board(hero, board[:3])),
+        ("exact_equity", lambda: enumerate_equity(hero, board, 1)),
+        ("monte_carlo", lambda: monte_carlo_equity(hero, board[:3], 2, ADAPTIVE_BATCH, 0)),
+    )
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+    return timings
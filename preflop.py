@@ -0,0 +1,101 @@
+import os
+import numpy as np
+from treys import Card
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "preflop_equity.npy")
+MAX_OPPONENTS = 9
+
+# =====================================================
+# HAND CLASSES
+# =====================================================
+# The 169 starting hands live on a 13x13 grid indexed by rank (0 = 2,
+# 12 = A): row > col is suited, row < col offsuit and the diagonal pairs.
+def hand_class(player_cards):
+    r1, r2 = (Card.get_rank_int(c) for c in player_cards)
+    hi, lo = max(r1, r2), min(r1, r2)
+    if Card.get_suit_int(player_cards[0]) == Card.get_suit_int(player_cards[1]):
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+
+def class_name(index):
+    row, col = divmod(index, 13)
+    hi, lo = Card.STR_RANKS[max(row, col)], Card.STR_RANKS[min(row, col)]
+    if row == col:
+        return hi + lo
+    return hi + lo + ("s" if row > col else "o")
+
+
+def class_cards(index):
+    """
+    A representative pair of treys cards for a hand class.
+    """
+    row, col = divmod(index, 13)
+    hi, lo = Card.STR_RANKS[max(row, col)], Card.STR_RANKS[min(row, col)]
+    return [Card.new(hi + "s"), Card.new(lo + ("s" if row > col else "h"))]
+
+
+# =====================================================
+# LOOKUP
+# =====================================================
+_table = None
+
+
+def load_table(path=TABLE_PATH):
+    """
+    Returns the (169, MAX_OPPONENTS, 3) win/tie/lose table, or None when
+    the data file has not been generated.
+    """
+    global _table
+    if _table is None and os.path.exists(path):
+        _table = np.load(path)
+    return _table
+
+
+def preflop_equity(player_cards, num_opponents):
+    table = load_table()
+    if table is None or not 1 <= num_opponents <= MAX_OPPONENTS:
+        return None
+    win, tie, lose = table[hand_class(player_cards), num_opponents - 1]
+    return float(win), float(tie), float(lose)
+
+
+# =====================================================
+# GENERATOR
+# =====================================================
+def _simulate_cell(task):
+    from poker_odds import monte_carlo_equity
+
+    index, opponents, sims, seed = task
+    return index, opponents, monte_carlo_equity(class_cards(index), [], opponents, sims, seed)
+
+
+def build_table(sims=200000, workers=None, seed=0):
+    from multiprocessing import Pool
+
+    cells = [(i, n) for i in range(169) for n in range(1, MAX_OPPONENTS + 1)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(cells))
+    tasks = [(i, n, sims, int(s)) for (i, n), s in zip(cells, seeds)]
+
+    table = np.zeros((169, MAX_OPPONENTS, 3), dtype=np.float32)
+    with Pool(workers) as pool:
+        for done, (i, n, result) in enumerate(pool.imap_unordered(_simulate_cell, tasks), 1):
+            table[i, n - 1] = result
+            if done % 169 == 0:
+                print(f"{done}/{len(tasks)} cells")
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the preflop equity table.")
+    parser.add_argument("--sims", type=int, default=200000, help="simulations per hand class and opponent count")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    table = build_table(args.sims, args.workers, args.seed)
+    os.makedirs(os.path.dirname(TABLE_PATH), exist_ok=True)
+    np.save(TABLE_PATH, table)
+    print(f"Wrote {TABLE_PATH}")
@@ -0,0 +1,296 @@
+import numpy as np
+from itertools import combinations
+from treys import Card
+from hand_eval import CARD_MASK, CARD_TO_INDEX, RANK_KEY, SUIT_KEY, card_mask, score_keys, to_indices
+from instrument import timed
+from preflop import class_name, load_table
+
+# Simulations per batch; each batch holds a (batch, combos) float matrix.
+RANGE_BATCH = 2000
+
+# =====================================================
+# COMBOS
+# =====================================================
+# All 1326 two-card combos as card-index pairs, with their dead-card masks
+# and 169-class index (same grid as preflop.hand_class).
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.intp)
+COMBO_MASK = CARD_MASK[COMBOS[:, 0]] | CARD_MASK[COMBOS[:, 1]]
+
+_hi = np.maximum(COMBOS[:, 0], COMBOS[:, 1]) // 4
+_lo = np.minimum(COMBOS[:, 0], COMBOS[:, 1]) // 4
+_suited = COMBOS[:, 0] % 4 == COMBOS[:, 1] % 4
+COMBO_CLASS = np.where(_suited, _hi * 13 + _lo, _lo * 13 + _hi)
+CLASS_NAMES = [class_name(i) for i in range(169)]
+
+BROADWAY = 8  # rank index of T
+
+KEYWORDS = {
+    "any": np.ones(len(COMBOS), dtype=bool),
+    "random": np.ones(len(COMBOS), dtype=bool),
+    "pairs": _hi == _lo,
+    "broadway": _lo >= BROADWAY,
+    "suited": _suited,
+    "offsuit": ~_suited & (_hi != _lo),
+}
+
+
+# =====================================================
+# PARSING
+# =====================================================
+def _class_mask(name):
+    if len(name) < 2:
+        raise ValueError(f"Unknown hand class: {name}")
+    name = name[0].upper() + name[1].upper() + name[2:].lower()
+    if name in CLASS_NAMES:
+        return COMBO_CLASS == CLASS_NAMES.index(name)
+    if len(name) == 2 and name[0] != name[1]:
+        return _class_mask(name + "s") | _class_mask(name + "o")
+    raise ValueError(f"Unknown hand class: {name}")
+
+
+def _plus_mask(name):
+    # "TT+" is TT..AA; "ATs+" / "AT+" raise the kicker up to just below
+    # the high card.
+    ranks = "23456789TJQKA"
+    if len(name) < 2:
+        raise ValueError(f"Unknown plus-range: {name}+")
+    hi, lo, rest = ranks.index(name[0].upper()), ranks.index(name[1].upper()), name[2:]
+    if lo > hi:
+        raise ValueError(f"Plus-range must name the high card first: {name}+")
+    if hi == lo:
+        return np.any([_class_mask(r + r) for r in ranks[lo:]], axis=0)
+    return np.any([_class_mask(ranks[hi] + r + rest) for r in ranks[lo:hi]], axis=0)
+
+
+def _top_mask(percent):
+    table = load_table()
+    if table is None:
+        raise ValueError("top-% ranges need the preflop equity table")
+    # Order classes by heads-up equity and take whole classes until the
+    # range covers `percent` of all combos.
+    strength = table[:, 0, 0] + table[:, 0, 1] / 2
+    counts = np.bincount(COMBO_CLASS, minlength=169)
+    order = np.argsort(-strength, kind="stable")
+    covered = np.cumsum(counts[order])
+    take = order[:int(np.searchsorted(covered, percent / 100 * len(COMBOS))) + 1]
+    return np.isin(COMBO_CLASS, take)
+
+
+def _token_mask(token):
+    token = token.replace(" ", "")
+    lower = token.lower()
+    if lower in KEYWORDS:
+        return KEYWORDS[lower]
+    if lower.startswith("top") and lower.endswith("%"):
+        return _top_mask(float(lower[3:-1]))
+    if (
+        len(token) == 4 and token[:2] != token[2:]
+        and all(r.upper() in "23456789TJQKA" for r in token[::2])
+        and all(c in "shdc" for c in token[1::2])
+    ):
+        i, j = sorted(CARD_TO_INDEX[Card.new(c[0].upper() + c[1])] for c in (token[:2], token[2:]))
+        return (COMBOS[:, 0] == i) & (COMBOS[:, 1] == j)
+    if token.endswith("+") and token[:-1] and token[0].upper() in "23456789TJQKA":
+        return _plus_mask(token[:-1])
+    if "+" in token:
+        return np.any([_token_mask(t) for t in token.split("+")], axis=0)
+    return _class_mask(token)
+
+
+def parse_range(spec):
+    """
+    Builds a weight per combo from a range spec:
+        None / "random"               - every combo, weight 1
+        "top 15%"                     - strongest classes by heads-up equity
+        "pairs+broadway", "TT+, ATs+" - keywords, classes and plus-ranges
+        "AKs:0.5, AsKs"               - explicit classes / combos with weights
+        {"QQ+": 1, "AKs": 0.5}        - the same as a mapping
+        [("AhKh", 0.25), "JJ"]        - or a list of tokens / (token, weight)
+    Later tokens override the weight of combos already in the range;
+    empty tokens are skipped and unknown ones raise ValueError.
+
+    Returns:
+        np.ndarray of shape (1326,) with non-negative weights
+    """
+    weights = np.zeros(len(COMBOS))
+    if spec is None:
+        spec = "random"
+    if isinstance(spec, str):
+        items = []
+        for token in spec.split(","):
+            token, _, weight = token.partition(":")
+            if token.strip():
+                items.append((token, float(weight) if weight else 1.0))
+    elif isinstance(spec, dict):
+        items = list(spec.items())
+    else:
+        items = [(t, 1.0) if isinstance(t, str) else t for t in spec]
+
+    for token, weight in items:
+        weight = float(weight)
+        if not np.isfinite(weight) or weight < 0:
+            raise ValueError(f"Weight must be a finite non-negative number: {token}:{weight}")
+        weights[_token_mask(token)] = weight
+    return weights
+
+
+# =====================================================
+# RANGE EQUITY
+# =====================================================
+def _range_shares(rng, hero, board, dead, ranges, sims):
+    dead_mask = np.full(sims, dead, dtype=np.int64)
+    weight = np.ones(sims)
+    opp_cards = []
+
+    for i, (combos, combo_mask, w) in enumerate(ranges):
+        # Inverse-CDF draw over each row's live combos; no rejections. The
+        # first opponent only sees the known cards, so one CDF serves all rows.
+        if i == 0:
+            cum = np.cumsum(w)
+            total = np.full(sims, cum[-1])
+            pick = np.searchsorted(cum, rng.random(sims) * cum[-1], side="right")
+        else:
+            live = np.where(combo_mask[None, :] & dead_mask[:, None] == 0, w[None, :], 0.0)
+            cum = np.cumsum(live, axis=1)
+            total = cum[:, -1]
+            pick = (cum <= (rng.random(sims) * total)[:, None]).sum(1)
+        pick = np.minimum(pick, len(combos) - 1)
+
+        # Dealing opponents one after another skews the joint distribution
+        # by each later opponent's normaliser; weighting every deal by the
+        # product of live range mass makes the estimate exact again.
+        weight *= total
+        opp_cards.append(combos[pick])
+        dead_mask |= combo_mask[pick]
+
+    missing = 5 - len(board)
+    order = rng.random((sims, 52))
+    order[(dead_mask[:, None] >> np.arange(52)) & 1 == 1] = 2.0
+    runout = np.argsort(order, axis=1)[:, :missing]
+
+    board_rank = RANK_KEY[board].sum() + RANK_KEY[runout].sum(1)
+    board_suit = SUIT_KEY[board].sum() + SUIT_KEY[runout].sum(1)
+    my_score = score_keys(board_rank + RANK_KEY[hero].sum(), board_suit + SUIT_KEY[hero].sum())
+
+    opps = np.stack(opp_cards, axis=1)
+    opp_scores = score_keys(
+        board_rank[:, None] + RANK_KEY[opps].sum(-1),
+        board_suit[:, None] + SUIT_KEY[opps].sum(-1)
+    )
+    best_opponent = opp_scores.min(1)
+
+    # Pot share per deal: 1 for a win, 1/k for a k-way split, 0 for a loss.
+    tied = (opp_scores == my_score[:, None]).sum(1)
+    shares = np.where(my_score <= best_opponent, 1.0 / (1 + tied), 0.0)
+    return shares, weight
+
+
+def _range_batch(rng, hero, board, dead, ranges, sims):
+    shares, weight = _range_shares(rng, hero, board, dead, ranges, sims)
+    wins = float(weight[shares == 1].sum())
+    losses = float(weight[shares == 0].sum())
+    return wins, float(weight.sum()) - wins - losses, losses
+
+
+def _prepare(player_cards, community_cards, ranges):
+    # (hero, board, dead mask, [(combos, masks, weights)] per opponent)
+    # with every combo outside its range or blocked by a known card dropped.
+    hero = np.array(to_indices(player_cards), dtype=np.intp)
+    board = np.array(to_indices(community_cards), dtype=np.intp)
+    dead = card_mask(player_cards + community_cards)
+
+    prepared = []
+    for spec in ranges:
+        w = spec if isinstance(spec, np.ndarray) else parse_range(spec)
+        if not np.isfinite(w).all() or (w < 0).any():
+            raise ValueError("Range weights must be finite and non-negative")
+        keep = (w > 0) & (COMBO_MASK & dead == 0)
+        if not keep.any():
+            raise ValueError("An opponent range has no combos left after card removal")
+        prepared.append((COMBOS[keep], COMBO_MASK[keep], w[keep]))
+    return hero, board, dead, prepared
+
+
+@timed
+def range_equity(
+    player_cards,
+    community_cards,
+    ranges,
+    simulations=10000,
+    seed=None
+):
+    """
+    Monte Carlo equity of `player_cards` against one opponent per entry of
+    `ranges`, each a parse_range spec or a ready weight array.
+
+    Returns:
+        (win, tie, lose) fractions
+    """
+    rng = np.random.default_rng(seed)
+    hero, board, dead, prepared = _prepare(player_cards, community_cards, ranges)
+
+    wins = ties = losses = 0.0
+    done = 0
+    while done < simulations:
+        sims = min(RANGE_BATCH, simulations - done)
+        w, t, l = _range_batch(rng, hero, board, dead, prepared, sims)
+        wins += w
+        ties += t
+        losses += l
+        done += sims
+        # No weight after a whole batch: the ranges cannot be dealt together.
+        if wins + ties + losses == 0:
+            raise ValueError("The opponent ranges cannot all be dealt together")
+
+    total = wins + ties + losses
+    return wins / total, ties / total, losses / total
+
+
+def stream_range_equity(
+    player_cards,
+    community_cards,
+    ranges,
+    target,
+    min_sims,
+    max_sims,
+    batch=RANGE_BATCH,
+    seed=None
+):
+    """
+    range_equity as a stream of snapshots, stopping the way
+    poker_odds.stream_equity does. Deals are weighted (see
+    _range_shares), so the margin uses the effective sample size.
+
+    Yields:
+        dict with win, tie, lose, margin and simulations
+    """
+    rng = np.random.default_rng(seed)
+    hero, board, dead, prepared = _prepare(player_cards, community_cards, ranges)
+
+    wins = losses = total = total_sq = weights = weights_sq = 0.0
+    done = 0
+    while done < max_sims:
+        shares, weight = _range_shares(rng, hero, board, dead, prepared, min(batch, max_sims - done))
+        wins += float(weight[shares == 1].sum())
+        losses += float(weight[shares == 0].sum())
+        total += float((weight * shares).sum())
+        total_sq += float((weight * shares ** 2).sum())
+        weights += float(weight.sum())
+        weights_sq += float((weight ** 2).sum())
+        done += len(shares)
+        # No weight after a whole batch: the ranges cannot be dealt together.
+        if weights == 0:
+            raise ValueError("The opponent ranges cannot all be dealt together")
+
+        mean = total / weights
+        effective = weights ** 2 / weights_sq
+        margin = 1.96 * np.sqrt(max(total_sq / weights - mean ** 2, 0.0) / effective)
+        yield {
+            "win": wins / weights,
+            "tie": (weights - wins - losses) / weights,
+            "lose": losses / weights,
+            "margin": float(margin),
+            "simulations": done
+        }
+        if done >= min_sims and margin <= target:
+            break
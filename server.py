@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import parse_count, parse_spot, pretty_cards
+from outs import rank_class
+from poker_odds import cache_stats, cached_analyses, cached_analysis, cached_equity, simulate_win_probability, warm_up
+from ui import HAND_RANKS
+
+# A batch closes once it holds MAX_BATCH requests or BATCH_WINDOW
+# seconds after its first request arrived, whichever comes first.
+MAX_BATCH = 64
+BATCH_WINDOW = 0.005
+
+# Requests/second is averaged over the last THROUGHPUT_WINDOW seconds.
+THROUGHPUT_WINDOW = 10.0
+
+MAX_BODY = 64 * 1024
+
+# Most threat holdings an /analysis reply lists (every two-card combo).
+MAX_THREATS = 1326
+
+
+# =====================================================
+# REQUESTS
+# =====================================================
+def equity_request(payload):
+    hole, board = parse_spot(payload)
+    opponents = parse_count(payload.get("opponents"), "opponents", 1, 9, 1)
+    simulations = parse_count(payload.get("simulations"), "simulations", 1, 1_000_000, 10000)
+    seed = payload.get("seed")
+    # The seed is part of the batching key, so it must be a plain int.
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValueError("seed must be an integer")
+    return ("equity", tuple(hole), tuple(board), opponents, simulations, seed)
+
+
+def analysis_request(payload):
+    hole, board = parse_spot(payload)
+    if len(board) < 3:
+        raise ValueError("analysis needs at least a flop")
+    return ("analysis", tuple(hole), tuple(board), parse_count(payload.get("threats"), "threats", 0, MAX_THREATS, 9))
+
+
+def analysis_reply(analysis, limit):
+    return {
+        "hand": HAND_RANKS[int(rank_class(analysis["hero_score"]))],
+        "hero_score": analysis["hero_score"],
+        "best": analysis["best"],
+        "nuts": [pretty_cards(h) for h in analysis["nuts"]],
+        "threats": [{"hand": pretty_cards(h), "score": sc} for h, sc in analysis["threats"][:limit]],
+        "beats": analysis["beats"],
+        "ties": analysis["ties"],
+        "loses": analysis["loses"],
+    }
+
+
+def compute(request):
+    """
+    Runs one request key built by equity_request / analysis_request.
+    """
+    if request[0] == "equity":
+        _, hole, board, opponents, simulations, seed = request
+        if seed is not None:
+            # Seeded runs are reproducible, so they skip the shared cache.
+            return simulate_win_probability(list(hole), list(board), opponents, simulations, seed)
+        win, tie, lose = cached_equity(list(hole), list(board), opponents, simulations)
+        return {"win": win, "tie": tie, "lose": lose}
+
+    _, hole, board, limit = request
+    return analysis_reply(cached_analysis(list(hole), list(board)), limit)
+
+
+def compute_batch(requests):
+    """
+    Every /analysis request in the batch is scored in one
+    cached_analyses call; equity requests are simulations with their own
+    deals and run one after another.
+    """
+    results = {}
+    analyses = [r for r in requests if r[0] == "analysis"]
+    try:
+        for request, analysis in zip(analyses, cached_analyses([(list(r[1]), list(r[2])) for r in analyses])):
+            results[request] = analysis_reply(analysis, request[3])
+    except Exception:
+        # Fall back to one at a time so the error lands on its own request.
+        pass
+
+    for request in requests:
+        if request in results:
+            continue
+        try:
+            results[request] = compute(request)
+        except Exception as e:
+            results[request] = e
+    return [results[request] for request in requests]
+
+
+# =====================================================
+# BATCHING
+# =====================================================
+class EquityService:
+    """
+    Queues requests from every connection and runs them in batches on one
+    compute thread. Identical requests in a batch are computed once, the
+    batch's /analysis spots are scored together (see compute_batch), and
+    every batch goes through the process-wide poker_odds cache.
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, window=BATCH_WINDOW):
+        self.max_batch = max_batch
+        self.window = window
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="equity")
+        self.in_flight = 0
+        self.started = time.monotonic()
+        self.completed = 0
+        self.batches = 0
+        self.computed = 0
+        self.largest_batch = 0
+        self._recent = deque()
+
+    async def submit(self, request):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((request, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.in_flight = len(batch)
+            try:
+                unique = list(dict.fromkeys(request for request, _ in batch))
+                results = dict(zip(unique, await loop.run_in_executor(self.executor, compute_batch, unique)))
+                outcomes = [results[request] for request, _ in batch]
+            except Exception as e:
+                # Fail this batch rather than the batcher task, which every
+                # later request is waiting on.
+                unique = []
+                outcomes = [e] * len(batch)
+
+            for (_, future), result in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+            now = time.monotonic()
+            self._recent.extend([now] * len(batch))
+            self.completed += len(batch)
+            self.batches += 1
+            self.computed += len(unique)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.in_flight = 0
+
+    def stats(self):
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - THROUGHPUT_WINDOW:
+            self._recent.popleft()
+        window = min(THROUGHPUT_WINDOW, now - self.started)
+        return {
+            "requests": self.completed,
+            "requests_per_sec": round(len(self._recent) / window, 1) if window > 0 else 0.0,
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "mean_batch": round(self.completed / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "computed": self.computed,
+            "uptime_sec": round(now - self.started, 1),
+            "cache": cache_stats(),
+        }
+
+
+# =====================================================
+# HTTP
+# =====================================================
+ROUTES = {
+    "/equity": equity_request,
+    "/analysis": analysis_request,
+}
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+async def _respond(writer, status, body, keep_alive):
+    data = json.dumps(body).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+
+
+async def _handle(service, method, path, body):
+    """
+    Returns:
+        (status, JSON body)
+    """
+    if path == "/stats":
+        return 200, service.stats()
+    if path not in ROUTES:
+        return 404, {"error": f"unknown path {path}"}
+    if method != "POST":
+        return 405, {"error": "use POST with a JSON body"}
+    try:
+        payload = json.loads(body or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("body must be a JSON object")
+        request = ROUTES[path](payload)
+    except (KeyError, ValueError, TypeError, OverflowError) as e:
+        return 400, {"error": str(e) or type(e).__name__}
+    try:
+        return 200, await service.submit(request)
+    except (KeyError, ValueError, TypeError) as e:
+        return 400, {"error": str(e) or type(e).__name__}
+    except Exception as e:
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+
+
+async def serve_connection(service, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            method, path, version = line.decode("latin-1").split()
+            headers = {}
+            while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = header.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            if length > MAX_BODY:
+                await _respond(writer, 413, {"error": "body too large"}, False)
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            status, payload = await _handle(service, method, path.split("?")[0], body)
+            await _respond(writer, status, payload, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host, port, max_batch, window):
+    warm_up()
+    service = EquityService(max_batch, window)
+    batcher = asyncio.create_task(service.run())
+    server = await asyncio.start_server(
+        lambda r, w: serve_connection(service, r, w), host, port
+    )
+    print(f"Serving on http://{host}:{port} (POST /equity, POST /analysis, GET /stats)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON equity service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW * 1000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.max_batch, args.window_ms / 1000))
+    except KeyboardInterrupt:
+        pass
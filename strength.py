@@ -0,0 +1,91 @@
+import numpy as np
+from hand_eval import CARD_MASK, RANK_KEY, SUIT_KEY, card_combinations, card_mask, live_cards, score_keys, to_cards, to_indices
+
+# Equity histogram buckets: 0-10%, 10-20%, ... 90-100%.
+BINS = 10
+
+
+# =====================================================
+# HAND STRENGTH
+# =====================================================
+def strength_distribution(player_cards, board_cards, num_opponents=1, bins=BINS):
+    """
+    The hero's all-in equity against every opponent holding on a flop,
+    turn or river board, over every remaining runout, plus hand strength
+    and potential (Billings et al.) from the same score matrix.
+
+    Returns:
+        dict with
+            holdings (list[tuple]) - every live opponent holding
+            equity (np.ndarray) - the hero's equity against each holding
+            histogram (np.ndarray) - holdings per equity bucket of 1/bins
+            hs (float) - share of holdings beaten now, ties counted half
+            hs_n (float) - hs ** num_opponents
+            ppot, npot (float) - chance of getting ahead when behind /
+                                 falling behind when ahead by the river
+            ehs (float) - effective hand strength, hs_n adjusted by potential
+            equity_mean (float) - equity against a random holding
+            percentile (float) - share of holdings the hero's equity is
+                                 at least 50% against
+    """
+    hero = to_indices(player_cards)
+    board = to_indices(board_cards)
+    live = live_cards(card_mask(player_cards + board_cards))
+
+    pairs = card_combinations(live, 2)
+    pair_mask = CARD_MASK[pairs].sum(1)
+    board_rank = RANK_KEY[board].sum()
+    board_suit = SUIT_KEY[board].sum()
+    hero_rank = board_rank + RANK_KEY[hero].sum()
+    hero_suit = board_suit + SUIT_KEY[hero].sum()
+    pair_rank = board_rank + RANK_KEY[pairs].sum(1)
+    pair_suit = board_suit + SUIT_KEY[pairs].sum(1)
+
+    # Ahead (1), tied (0) or behind (-1) against each holding, now and
+    # on every runout the holding does not block.
+    now = np.sign(score_keys(pair_rank, pair_suit) - score_keys(hero_rank, hero_suit))
+
+    runouts = card_combinations(live, 5 - len(board))
+    runout_rank = RANK_KEY[runouts].sum(1)
+    runout_suit = SUIT_KEY[runouts].sum(1)
+    hero_later = score_keys(hero_rank + runout_rank, hero_suit + runout_suit)
+    later = np.sign(
+        score_keys(pair_rank[:, None] + runout_rank[None, :], pair_suit[:, None] + runout_suit[None, :])
+        - hero_later[None, :]
+    )
+    valid = CARD_MASK[runouts].sum(1)[None, :] & pair_mask[:, None] == 0
+
+    share = np.where(valid, (later + 1) / 2, 0.0)
+    equity = share.sum(1) / valid.sum(1)
+
+    # hp[i, j]: (holding, runout) cells going from state i now to state j
+    # at the river, states ordered behind / tied / ahead.
+    hp = np.zeros((3, 3))
+    for i in range(3):
+        rows = later[now == i - 1]
+        rows_valid = valid[now == i - 1]
+        for j in range(3):
+            hp[i, j] = ((rows == j - 1) & rows_valid).sum()
+    totals = hp.sum(1)
+
+    behind, tied, ahead = 0, 1, 2
+    ppot_base = totals[behind] + totals[tied] / 2
+    npot_base = totals[ahead] + totals[tied] / 2
+    ppot = (hp[behind, ahead] + hp[behind, tied] / 2 + hp[tied, ahead] / 2) / ppot_base if ppot_base else 0.0
+    npot = (hp[ahead, behind] + hp[tied, behind] / 2 + hp[ahead, tied] / 2) / npot_base if npot_base else 0.0
+
+    hs = float(((now + 1) / 2).mean())
+    hs_n = hs ** num_opponents
+
+    return {
+        "holdings": [tuple(to_cards(p)) for p in pairs],
+        "equity": equity,
+        "histogram": np.histogram(equity, bins=bins, range=(0.0, 1.0))[0],
+        "hs": hs,
+        "hs_n": hs_n,
+        "ppot": float(ppot),
+        "npot": float(npot),
+        "ehs": float(hs_n * (1 - npot) + (1 - hs_n) * ppot),
+        "equity_mean": float(equity.mean()),
+        "percentile": float((equity >= 0.5).mean()),
+    }
@@ -0,0 +1,28 @@
+from batch import analyze_stream, read_records
+
+LINES = [
+    '{"hole": "AsKh", "board": "2c7d9h", "opponents": 2}',
+    '{"hole": "AsK"}',
+    '[1, 2]',
+    '{bad json',
+    '{"hole": "AsKh", "opponents": 1e400}',
+    '{"hole": "AsKh", "opponents": 2.7}',
+    '{"hole": "AsKh", "opponents": true}',
+    '{"hole": "AsKh", "opponents": 10}',
+    '{"hole": "AsKh", "opponents": 3.0}',
+    '{"hole": ["As", "Kx"]}',
+    '{"hole": "QsQh"}',
+]
+
+
+def test_bad_records_become_error_rows(tmp_path):
+    path = tmp_path / "hands.jsonl"
+    path.write_text("\n".join(LINES) + "\n")
+    results = list(analyze_stream(read_records(str(path)), workers=1, chunk_size=4))
+
+    assert [r["line"] for r in results] == list(range(1, len(LINES) + 1))
+    errors = [r["line"] for r in results if "error" in r]
+    assert errors == [2, 3, 4, 5, 6, 7, 8, 10]
+    assert results[0]["opponents"] == 2 and "threats" in results[0]
+    assert results[8]["opponents"] == 3
+    assert results[10]["win"] > 0.75
@@ -0,0 +1,54 @@
+import pytest
+
+from decision import call_decision
+
+
+def test_pot_odds():
+    # 100 in the pot after a 50 bet: call 50 to win 150, so 25% breaks even.
+    d = call_decision(0.3, 0.0, 150, 50)
+    assert d["call"] == 50
+    assert d["pot_after"] == 200
+    assert d["pot_odds"] == pytest.approx(3.0)
+    assert d["required_equity"] == pytest.approx(0.25)
+    assert d["call_ev"] == pytest.approx(10.0)
+    assert d["action"] == "call"
+    assert d["implied_max"] is None
+
+
+def test_short_stack_call():
+    # Only 30 of the 50 bet can be called; the other 20 goes back.
+    d = call_decision(0.2, 0.0, 150, 50, hero_stack=30)
+    assert d["call"] == 30
+    assert d["pot_after"] == 160
+    assert d["required_equity"] == pytest.approx(30 / 160)
+    assert d["call_ev"] == pytest.approx(2.0)
+    assert d["implied_max"] == 0.0
+
+
+def test_all_in_hero_has_nothing_to_call():
+    d = call_decision(0.5, 0.0, 150, 50, hero_stack=0)
+    assert d["call"] == 0
+    assert d["pot_odds"] is None
+
+
+def test_implied_odds():
+    # 20% equity needs 50 / 0.2 = 250 in total; the pot after calling is 200.
+    d = call_decision(0.2, 0.0, 150, 50, hero_stack=500, opponent_stack=300)
+    assert d["action"] == "fold"
+    assert d["call_ev"] == pytest.approx(-10.0)
+    assert d["implied_needed"] == pytest.approx(50.0)
+    # The bettor's 300 is all still behind; the hero has 450 after calling.
+    assert d["implied_max"] == pytest.approx(300.0)
+    assert d["implied_ok"]
+    assert d["implied_equity"] == pytest.approx(50 / 500)
+
+
+def test_implied_odds_capped_by_hero_stack():
+    d = call_decision(0.2, 0.0, 150, 50, hero_stack=90, opponent_stack=300, num_opponents=2)
+    assert d["implied_max"] == pytest.approx(80.0)
+    assert d["implied_equity"] == pytest.approx(50 / 280)
+
+
+def test_ties_split_the_pot():
+    d = call_decision(0.2, 0.2, 150, 50, tie_share=0.5)
+    assert d["equity"] == pytest.approx(0.3)
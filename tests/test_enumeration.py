@@ -0,0 +1,51 @@
+from itertools import combinations
+
+import pytest
+from treys import Card, Deck, Evaluator
+
+from poker_odds import enumerate_equity, simulate_equity
+
+
+def cards(*names):
+    return [Card.new(c) for c in names]
+
+
+def brute_force(player, board):
+    # Heads-up turn equity by scoring every river and opponent hand with treys.
+    evaluator = Evaluator()
+    live = [c for c in Deck.GetFullDeck() if c not in player + board]
+    wins = ties = total = 0
+    for river in live:
+        full = board + [river]
+        mine = evaluator.evaluate(full, player)
+        for opp in combinations([c for c in live if c != river], 2):
+            theirs = evaluator.evaluate(full, list(opp))
+            wins += mine < theirs
+            ties += mine == theirs
+            total += 1
+    return wins / total, ties / total, (total - wins - ties) / total
+
+
+# Paired boards: runouts that give a hole pair the fourth card of a rank
+# used to index past the rank table.
+@pytest.mark.parametrize("player, board", [
+    (cards("Ks", "Qh"), cards("As", "Ad", "2c")),
+    (cards("7h", "7d"), cards("7s", "Kd", "Kc")),
+    (cards("Jc", "Th"), cards("9s", "9d", "3h", "3c")),
+])
+def test_paired_board_heads_up(player, board):
+    win, tie, lose = simulate_equity(player, board, 1)
+    assert win + tie + lose == pytest.approx(1.0)
+    assert min(win, tie, lose) >= 0.0
+
+
+def test_paired_turn_matches_brute_force():
+    player, board = cards("Ks", "Qh"), cards("As", "Ad", "2c", "Kd")
+    assert enumerate_equity(player, board, 1) == pytest.approx(brute_force(player, board))
+
+
+def test_paired_flop_matches_monte_carlo():
+    player, board = cards("Ks", "Qh"), cards("As", "Ad", "2c")
+    exact = enumerate_equity(player, board, 1)
+    sampled = simulate_equity(player, board, 1, 200000, seed=1, exact_limit=0)
+    assert exact == pytest.approx(sampled, abs=0.01)
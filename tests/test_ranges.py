@@ -0,0 +1,35 @@
+import time
+
+import pytest
+from treys import Card
+
+from ranges import parse_range, stream_range_equity
+
+
+def test_empty_tokens_are_skipped():
+    assert (parse_range("TT+, ") == parse_range("TT+")).all()
+    assert (parse_range("AKs,,QQ") == parse_range("AKs, QQ")).all()
+
+
+@pytest.mark.parametrize("spec", ["A", "A+", "K, TT+", "AsKx", "xhKs", "Z9"])
+def test_bad_tokens_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        parse_range(spec)
+
+
+def test_lowercase_combo():
+    assert parse_range("ahkh").sum() == 1
+
+
+@pytest.mark.parametrize("spec", ["AKs:inf", "AKs:nan", "AKs:-1", "KA+", "T9s+, 9T+"])
+def test_bad_weights_and_reversed_plus_ranges(spec):
+    with pytest.raises(ValueError):
+        parse_range(spec)
+
+
+def test_undealable_ranges_fail_fast():
+    hero = [Card.new("As"), Card.new("Ad")]
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        list(stream_range_equity(hero, [], ["AA", "AA"], 0.005, 2000, 200000))
+    assert time.perf_counter() - start < 1.0
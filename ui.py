@@ -0,0 +1,123 @@
+from functools import lru_cache
+from treys import Card
+
+# Static tables and CSS for the page. Kept out of app.py, which Streamlit
+# re-executes on every rerun, so they are built once per process.
+SUITS = {"s": "♠", "h": "♥", "d": "♦", "c": "♣"}
+RANKS = ["A","K","Q","J","T","9","8","7","6","5","4","3","2"]
+HAND_RANKS = {
+    0: "Royal Flush",
+    1: "Straight Flush",
+    2: "Four of a Kind",
+    3: "Full House",
+    4: "Flush",
+    5: "Straight",
+    6: "Three of a Kind",
+    7: "Two Pair",
+    8: "One Pair",
+    9: "High Card",
+}
+
+ANIMATION_CSS = """
+<style>
+@keyframes slideApart {
+    from {
+        margin-left: -60px;
+        opacity: 0.7;
+        transform: translateY(4px);
+    }
+    to {
+        margin-left: -20px;
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+</style>
+"""
+
+
+def pretty(card):
+    r, s = Card.int_to_str(card)
+    return r + SUITS[s]
+
+
+# =====================================================
+# CARD HTML
+# =====================================================
+# One fragment per card, split where per-use style (offsets, animation)
+# goes: html = head + style + tail. Rows are memoized on the card tuple
+# and animation flag, so a rerun only joins strings it has not seen.
+CARD_STYLE = (
+    "width:60px;height:90px;border:1.5px solid #333;border-radius:8px;"
+    "background:white;box-shadow:2px 2px 6px rgba(0,0,0,0.25);"
+    "display:flex;flex-direction:column;justify-content:space-between;"
+    "padding:4px;font-weight:bold;flex-shrink:0;"
+)
+ANIMATION = "animation: slideApart 2s ease-out;"
+
+
+def _card_fragment(card):
+    r, s = Card.int_to_str(card)
+    label = r + SUITS[s]
+    color = "red" if s in ("h", "d") else "black"
+    head = f'<div style="{CARD_STYLE}color:{color};'
+    tail = (
+        f'"><div style="font-size:12px;">{label}</div>'
+        f'<div style="font-size:26px;text-align:center;">{SUITS[s]}</div>'
+        f'<div style="font-size:12px;text-align:right;">{label}</div></div>'
+    )
+    return head, tail
+
+
+CARD_FRAGMENTS = {Card.new(r + s): _card_fragment(Card.new(r + s)) for r in RANKS for s in SUITS}
+
+
+def card_html(card, style=""):
+    head, tail = CARD_FRAGMENTS[card]
+    return head + style + tail
+
+
+def _fanned(cards, animate, offset):
+    # First card indented, each later one `offset` px after the previous
+    # (negative to overlap).
+    return "".join(
+        card_html(c, "margin-left:30%;" if i == 0 else f"margin-left:{offset}px;" + (ANIMATION if animate else ""))
+        for i, c in enumerate(cards)
+    )
+
+
+@lru_cache(maxsize=4096)
+def hand_html(cards, animate=False):
+    return f"<div class='hand' style='display:flex;align-items:center;'>{_fanned(cards, animate, 30)}</div>"
+
+
+@lru_cache(maxsize=256)
+def best_five_html(cards, animate=False):
+    return f"<div class='hand' style='display:flex;align-items:center;'>{_fanned(cards, animate, -20)}</div>"
+
+
+@lru_cache(maxsize=4096)
+def board_html(cards, animate=False):
+    """
+    Flop, turn and river with wider gaps between streets; the newest
+    street slides in when `animate` is set.
+    """
+    gaps = (0, 12, 12, 75, 75)
+    newest = {3: (1, 2), 4: (3,), 5: (4,)}.get(len(cards), ())
+    row = "".join(
+        card_html(c, f"margin-left:{gaps[i]}px;" + (ANIMATION if animate and i in newest else ""))
+        for i, c in enumerate(cards)
+    )
+    return f"<div class='table'><div style='display:flex;margin-left:15%;'>{row}</div></div>"
+
+
+@lru_cache(maxsize=1024)
+def hands_grid_html(hands, animate=False, columns=3):
+    """
+    Several hole-card pairs in one grid, for a single st.markdown call.
+    """
+    cells = "".join(f"<div>{hand_html(h, animate)}</div>" for h in hands)
+    return (
+        f"<div style='display:grid;grid-template-columns:repeat({columns},1fr);"
+        f"row-gap:16px;margin-bottom:8px;'>{cells}</div>"
+    )